@@ -1,16 +1,16 @@
 # Amirreza Mirzaei 98106112         Arman Soleimani 98105835
-from anytree import RenderTree
+import argparse
+import functools
 
 from parsers.parser_transition_diagram import parse_transition_diagram
+from scanner import SCANNERS, READERS, ScannerResult, cache, engine_reader, guarded
 
 
 def write_to_file(code, errors, tree):
-    tree_str = ''
-    for pre, fill, node in RenderTree(tree):
-        tree_str += "%s%s" % (pre, node.name) + '\n'
-    f = open("parse_Tree.txt", "w", encoding='utf-8')
-    f.write(tree_str.strip())
-    f.close()
+    if tree is not None:  # there is no tree with --no-tree
+        f = open("parse_Tree.txt", "w", encoding='utf-8')
+        f.write(tree.render().strip())
+        f.close()
 
     if semantic_errors:
         string_to_write = ''
@@ -38,5 +38,32 @@ def write_to_file(code, errors, tree):
         f.close()
 
 
-tree, parse_errors, three_address_code, semantic_errors = parse_transition_diagram()
+arg_parser = argparse.ArgumentParser()
+arg_parser.add_argument('--scanner', choices=SCANNERS.keys(), default='dfa', help='scanner engine to use')
+arg_parser.add_argument('--reader', choices=READERS.keys(), default='file', help='how the input file is read')
+arg_parser.add_argument('--cache', metavar='DIR', help='reuse the tokens of unchanged inputs from this directory')
+arg_parser.add_argument('--guarded', action='store_true', help='bound the lexical errors of junk input')
+arg_parser.add_argument('--error-budget', type=int, default=guarded.ERROR_BUDGET,
+                        help='with --guarded, errors after which the scan is aborted')
+arg_parser.add_argument('--max-errors-per-line', type=int, default=guarded.MAX_ERRORS_PER_LINE,
+                        help='with --guarded, errors kept for a single line')
+arg_parser.add_argument('--max-errors', type=int, default=guarded.MAX_ERRORS,
+                        help='with --guarded, errors kept for the whole file')
+arg_parser.add_argument('--no-tree', action='store_true', help='build no parse tree and skip parse_Tree.txt')
+args = arg_parser.parse_args()
+if args.cache and args.guarded:
+    arg_parser.error('--cache can not be combined with --guarded')
+
+scanner, result_class = SCANNERS[args.scanner], ScannerResult
+reader_class = engine_reader(args.scanner, READERS[args.reader])
+if args.cache:
+    reader_class = functools.partial(cache.CachedReader, cache=cache.TokenCache(args.cache), reader_class=reader_class,
+                                     scanner=scanner)
+    scanner = cache.get_next_token
+if args.guarded:
+    scanner = functools.partial(guarded.get_next_token, scanner=scanner)
+    result_class = functools.partial(guarded.GuardedResult, args.max_errors_per_line, args.max_errors,
+                                     args.error_budget)
+tree, parse_errors, three_address_code, semantic_errors = parse_transition_diagram(scanner, reader_class,
+                                                                                   result_class, not args.no_tree)
 write_to_file(three_address_code, semantic_errors, tree)
\ No newline at end of file
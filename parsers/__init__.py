@@ -1 +1,6 @@
-from parsers.parser_transition_diagram import TransitionDiagram
\ No newline at end of file
+def __getattr__(name):
+    # imported on first use, so python -m parsers.grammar_analysis doesn't import grammar_analysis twice
+    if name == 'TransitionDiagram':
+        from parsers.parser_transition_diagram import TransitionDiagram
+        return TransitionDiagram
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
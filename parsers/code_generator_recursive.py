@@ -2,8 +2,9 @@ DEBUG = False
 
 
 class Symbol:
-    def __init__(self, name, kind=None, args_count=None, type=None, scope=None, address=None):
+    def __init__(self, name, kind=None, args_count=None, type=None, scope=None, address=None, symbol_id=None):
         self.name = name
+        self.symbol_id = symbol_id  # id of the name in the symbol table of the scanner
         self.kind = kind  # function/var/array/reference
         self.args_count = args_count
         self.type = type
@@ -33,8 +34,8 @@ class SymbolTable:
         self.symbol_stack = [0]
         self.data_pointer = 3000
 
-    def add(self, name, kind=None, type=None):
-        symbol = Symbol(name, kind=kind, scope=len(self.symbol_stack), type=type)
+    def add(self, name, kind=None, type=None, symbol_id=None):
+        symbol = Symbol(name, kind=kind, scope=len(self.symbol_stack), type=type, symbol_id=symbol_id)
         self.symbol_table.append(symbol)
         if kind == 'function':
             self.new_scope()
@@ -106,72 +107,10 @@ class ThreeCodeGenerator:
 
     def semantic_action(self, action_symbol, current_token):
         # print(action_symbol, self.semantic_stack, self.function_to_be_called)
-        if action_symbol == '#begin':
-            self.begin()
-        elif action_symbol == '#end':
-            self.end()
-        elif action_symbol == '#push':
-            self.push(current_token.content)
-        elif action_symbol == '#create_symbol':
-            self.create_symbol(current_token)
-        elif action_symbol == '#func_start':
-            self.func_start()
-        elif action_symbol == '#set_kind_to_var':
-            self.set_kind_to_var(current_token)
-        elif action_symbol == '#set_kind_to_array':
-            self.set_kind_to_array(current_token)
-        elif action_symbol == '#set_kind_to_var_declare':
-            self.set_kind_to_var(current_token, initialize=True)
-        elif action_symbol == '#set_kind_to_array_declare':
-            self.set_kind_to_array(current_token, initialize=True)
-        elif action_symbol == '#new_scope':
-            self.new_scope()
-        elif action_symbol == '#end_func_scope':
-            self.end_func_scope()
-        elif action_symbol == '#increase_func_arg':
-            self.increase_func_arg()
-        elif action_symbol == '#set_kind_to_reference':
-            self.set_kind_to_reference(current_token)
-        elif action_symbol == '#pop_semantic_stack':
-            self.pop_semantic_stack()
-        elif action_symbol == '#break_repeat':
-            self.break_repeat(current_token)
-        elif action_symbol == '#save':
-            self.save()
-        elif action_symbol == '#jpf_if':
-            self.jpf_if()
-        elif action_symbol == '#jpf_save_if':
-            self.jpf_save_if(current_token)
-        elif action_symbol == '#jp_if':
-            self.jp_if()
-        elif action_symbol == '#repeat_start':
-            self.repeat_start()
-        elif action_symbol == '#until':
-            self.until()
-        elif action_symbol == '#return_void':
-            self.return_void()
-        elif action_symbol == '#return_exp':
-            self.return_exp()
-        elif action_symbol == '#pid':
-            self.pid(current_token)
-        elif action_symbol == '#assign':
-            self.assign()
-        elif action_symbol == '#get_array_cell_address':
-            self.get_array_cell_address()
-        elif action_symbol == '#operation':
-            self.operation(current_token)
-        elif action_symbol == '#multiply':
-            self.operation(current_token, mult=True)
-        elif action_symbol == '#save_num':
-            self.save_num(current_token)
-        elif action_symbol == '#start_function':
-            self.start_function()
-        elif action_symbol == '#call_func':
-            self.call_func(current_token)
-        elif action_symbol == '#add_arg':
-            self.add_arg()
-        else:
+        action = SEMANTIC_ACTIONS.get(action_symbol)
+        if action is None:
             raise ValueError(f'invalid action symbol: {action_symbol}')
+        action(self, current_token)
 
     def get_temp_address(self):
         address = self.last_temp_address
@@ -218,7 +157,7 @@ class ThreeCodeGenerator:
 
     def create_symbol(self, current_token):
         # we don't know the kind(var,array,function,reference) of the symbol yet
-        self.SymbolTable.add(current_token.content, type=self.semantic_stack.pop())
+        self.SymbolTable.add(current_token.content, type=self.semantic_stack.pop(), symbol_id=current_token.symbol_id)
 
     def func_start(self):
         func = self.SymbolTable.symbol_table[-1]
@@ -357,7 +296,7 @@ class ThreeCodeGenerator:
             flag = True
             for symbol in reversed(self.SymbolTable.symbol_table):
                 if (symbol.scope == scope and flag) or symbol.scope == 1:
-                    if symbol.name == current_token.content:
+                    if symbol.symbol_id == current_token.symbol_id:
                         if symbol.kind == 'var' or symbol.kind == 'array':
                             t = self.get_temp_address()
                             self.add_code_to_program_block('ASSIGN', arg1=f'#{symbol.address}', arg2=t, debug='#pid')
@@ -515,3 +454,40 @@ class ThreeCodeGenerator:
         if self.function_not_found_error:
             return
         self.function_args.append(self.semantic_stack.pop())
+
+
+# what every action symbol does, as functions of (generator, current token) that a parser can look up once
+SEMANTIC_ACTIONS = {
+    '#begin': lambda gen, token: gen.begin(),
+    '#end': lambda gen, token: gen.end(),
+    '#push': lambda gen, token: gen.push(token.content),
+    '#create_symbol': lambda gen, token: gen.create_symbol(token),
+    '#func_start': lambda gen, token: gen.func_start(),
+    '#set_kind_to_var': lambda gen, token: gen.set_kind_to_var(token),
+    '#set_kind_to_array': lambda gen, token: gen.set_kind_to_array(token),
+    '#set_kind_to_var_declare': lambda gen, token: gen.set_kind_to_var(token, initialize=True),
+    '#set_kind_to_array_declare': lambda gen, token: gen.set_kind_to_array(token, initialize=True),
+    '#new_scope': lambda gen, token: gen.new_scope(),
+    '#end_func_scope': lambda gen, token: gen.end_func_scope(),
+    '#increase_func_arg': lambda gen, token: gen.increase_func_arg(),
+    '#set_kind_to_reference': lambda gen, token: gen.set_kind_to_reference(token),
+    '#pop_semantic_stack': lambda gen, token: gen.pop_semantic_stack(),
+    '#break_repeat': lambda gen, token: gen.break_repeat(token),
+    '#save': lambda gen, token: gen.save(),
+    '#jpf_if': lambda gen, token: gen.jpf_if(),
+    '#jpf_save_if': lambda gen, token: gen.jpf_save_if(token),
+    '#jp_if': lambda gen, token: gen.jp_if(),
+    '#repeat_start': lambda gen, token: gen.repeat_start(),
+    '#until': lambda gen, token: gen.until(),
+    '#return_void': lambda gen, token: gen.return_void(),
+    '#return_exp': lambda gen, token: gen.return_exp(),
+    '#pid': lambda gen, token: gen.pid(token),
+    '#assign': lambda gen, token: gen.assign(),
+    '#get_array_cell_address': lambda gen, token: gen.get_array_cell_address(),
+    '#operation': lambda gen, token: gen.operation(token),
+    '#multiply': lambda gen, token: gen.operation(token, mult=True),
+    '#save_num': lambda gen, token: gen.save_num(token),
+    '#start_function': lambda gen, token: gen.start_function(),
+    '#call_func': lambda gen, token: gen.call_func(token),
+    '#add_arg': lambda gen, token: gen.add_arg(),
+}
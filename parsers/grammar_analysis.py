@@ -0,0 +1,232 @@
+"""
+FIRST, FOLLOW and LL(1) conflicts of parsers/grammar.txt.
+the parsers load the result from a precompiled artifact that is built again whenever grammar.txt changes.
+run it from the project root with: python -m parsers.grammar_analysis
+"""
+import functools
+import hashlib
+import marshal
+import os
+import sys
+import warnings
+
+from parsers.parse_table import ParseTable
+from scanner.terminals import GRAMMAR_FILE, EPSILON, END, TERMINALS, TERMINAL_IDS, read_grammar
+
+ARTIFACT_VERSION = 1
+ARTIFACT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__',
+                             f'grammar.{ARTIFACT_VERSION}.marshal')
+
+
+def terminal_names(bits):
+    """
+    this function will return the terminals of a bitset, bit i is the terminal with id i
+    """
+    return [terminal for terminal_id, terminal in enumerate(TERMINALS) if bits >> terminal_id & 1]
+
+
+def terminal_set(terminals):
+    """
+    this function will return the ids of a list of grammar terminals as a frozenset, EPSILON is left out
+    """
+    return frozenset(TERMINAL_IDS[terminal] for terminal in terminals if terminal in TERMINAL_IDS)
+
+
+def first_follow(grammar):
+    """
+    this function will return the First and Follow of every non terminal of a grammar as sets of terminal ids, and
+    the set of non terminals that can be empty
+    """
+    first, follow, nullable = {}, {}, set()
+    for non_terminal, entry in grammar.items():
+        if non_terminal == 'TERMINALS':
+            continue
+        first[non_terminal] = terminal_set(entry['First'])
+        follow[non_terminal] = terminal_set(entry['Follow'])
+        if EPSILON in entry['First']:
+            nullable.add(non_terminal)
+    return first, follow, nullable
+
+
+class GrammarAnalysis:
+    """
+    FIRST and FOLLOW of every non terminal as int bitsets over the terminal ids, computed by fixed point iteration,
+    and the LL(1) conflicts of the grammar
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.start = next(iter(rules))
+        self.first = dict.fromkeys(rules, 0)
+        self.nullable = set()
+        self.follow = dict.fromkeys(rules, 0)
+        self.compute_first()
+        self.compute_follow()
+        self.conflicts = self.find_conflicts()
+
+    def first_of(self, symbols):
+        """
+        this function will return (FIRST bitset, can be empty) of a sequence of symbols
+        """
+        bits = 0
+        for symbol in symbols:
+            if symbol == EPSILON:
+                continue
+            if symbol not in self.rules:
+                return bits | 1 << TERMINAL_IDS[symbol], False
+            bits |= self.first[symbol]
+            if symbol not in self.nullable:
+                return bits, False
+        return bits, True
+
+    def compute_first(self):
+        changed = True
+        while changed:
+            changed = False
+            for non_terminal, alternatives in self.rules.items():
+                for alternative in alternatives:
+                    bits, nullable = self.first_of(alternative)
+                    if bits & ~self.first[non_terminal]:
+                        self.first[non_terminal] |= bits
+                        changed = True
+                    if nullable and non_terminal not in self.nullable:
+                        self.nullable.add(non_terminal)
+                        changed = True
+
+    def compute_follow(self):
+        self.follow[self.start] = 1 << TERMINAL_IDS[END]
+        changed = True
+        while changed:
+            changed = False
+            for non_terminal, alternatives in self.rules.items():
+                for alternative in alternatives:
+                    for i, symbol in enumerate(alternative):
+                        if symbol not in self.rules:
+                            continue
+                        bits, nullable = self.first_of(alternative[i + 1:])
+                        if nullable:
+                            bits |= self.follow[non_terminal]
+                        if bits & ~self.follow[symbol]:
+                            self.follow[symbol] |= bits
+                            changed = True
+
+    def find_conflicts(self):
+        """
+        this function will return a message for every pair of alternatives of a non terminal that the same terminal
+        predicts
+        """
+        conflicts = []
+        for non_terminal, alternatives in self.rules.items():
+            predicts = []
+            for alternative in alternatives:
+                bits, nullable = self.first_of(alternative)
+                predicts.append(bits | self.follow[non_terminal] if nullable else bits)
+            for i in range(len(alternatives)):
+                for j in range(i + 1, len(alternatives)):
+                    common = predicts[i] & predicts[j]
+                    if common:
+                        conflicts.append(f'{non_terminal}: {" ".join(alternatives[i])} | {" ".join(alternatives[j])} '
+                                         f'on {" ".join(terminal_names(common))}')
+        return conflicts
+
+    def to_grammar(self):
+        """
+        this function will return the analysis in the layout the parsers read, the TERMINALS and the
+        First, Follow and numbered Rules of every non terminal
+        """
+        grammar = {'TERMINALS': TERMINALS[:-1]}
+        for non_terminal, alternatives in self.rules.items():
+            first = terminal_names(self.first[non_terminal])
+            if non_terminal in self.nullable:
+                first.append(EPSILON)
+            grammar[non_terminal] = {
+                'First': first,
+                'Follow': terminal_names(self.follow[non_terminal]),
+                'Rules': {str(number): alternative for number, alternative in enumerate(alternatives, 1)},
+            }
+        return grammar
+
+
+def grammar_hash(file_name):
+    with open(file_name, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build_artifact(grammar_file=GRAMMAR_FILE, artifact_file=ARTIFACT_FILE):
+    """
+    this function will analyse the grammar and write the artifact, it returns the artifact
+    """
+    analysis = GrammarAnalysis(read_grammar(grammar_file)[0])
+    artifact = {'hash': grammar_hash(grammar_file), 'grammar': analysis.to_grammar(), 'conflicts': analysis.conflicts}
+    try:
+        os.makedirs(os.path.dirname(artifact_file), exist_ok=True)
+        with open(artifact_file + '.tmp', 'wb') as f:
+            marshal.dump(artifact, f)
+        os.replace(artifact_file + '.tmp', artifact_file)
+    except OSError:  # a read only install, the grammar is analysed again next time
+        pass
+    return artifact
+
+
+def load_grammar(grammar_file=GRAMMAR_FILE, artifact_file=ARTIFACT_FILE):
+    """
+    this function will return the analysed grammar in the layout of to_grammar, from the artifact if it was built
+    from the current grammar.txt. LL(1) conflicts are reported as warnings.
+    """
+    artifact = None
+    try:
+        with open(artifact_file, 'rb') as f:
+            artifact = marshal.loads(f.read())  # much faster than marshal.load on the file
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    if not isinstance(artifact, dict) or artifact.get('hash') != grammar_hash(grammar_file):
+        artifact = build_artifact(grammar_file, artifact_file)
+    for conflict in artifact['conflicts']:
+        warnings.warn(f'LL(1) conflict in {os.path.basename(grammar_file)}: {conflict}')
+    return artifact['grammar']
+
+
+class ParserGrammar:
+    """
+    the grammar the way the parsers use it, in the layout of to_grammar and with First and Follow as frozensets of
+    terminal ids. there is only one per process, see parser_grammar.
+    """
+
+    def __init__(self, grammar):
+        self.layout = grammar
+        self.first, self.follow, self.nullable = first_follow(grammar)
+        # the terminals a non terminal can start with, with its Follow if it can be empty
+        self.predict = {non_terminal: first | self.follow[non_terminal] if non_terminal in self.nullable else first
+                        for non_terminal, first in self.first.items()}
+        self.table = None  # the ParseTable, built by the first parser that needs it
+
+    def parse_table(self):
+        if self.table is None:
+            self.table = ParseTable(self.layout, self.first, self.follow, self.nullable)
+        return self.table
+
+
+@functools.lru_cache(maxsize=None)
+def parser_grammar():
+    """
+    this function will return the ParserGrammar of grammar.txt, it is loaded once per process and shared by all the
+    parsers
+    """
+    return ParserGrammar(load_grammar())
+
+
+def main():
+    analysis = GrammarAnalysis(read_grammar()[0])
+    for non_terminal in analysis.rules:
+        first = terminal_names(analysis.first[non_terminal]) + ([EPSILON] if non_terminal in analysis.nullable else [])
+        follow = terminal_names(analysis.follow[non_terminal])
+        print(f'{non_terminal}\n  First: {" ".join(first)}\n  Follow: {" ".join(follow)}')
+    for conflict in analysis.conflicts:
+        print(f'LL(1) conflict: {conflict}')
+    build_artifact()
+    if analysis.conflicts:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
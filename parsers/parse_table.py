@@ -0,0 +1,42 @@
+from scanner.terminals import TERMINALS, TERMINAL_IDS
+
+
+class ParseTable:
+    """
+    the LL(1) table of a grammar in the layout of GrammarAnalysis.to_grammar, with its First, Follow and nullable
+    from first_follow. symbols are ints, the terminals first in the order of TERMINALS and then the non terminals, and
+    the production of a (non terminal, terminal id) pair is a single lookup in a flat list.
+    a production is the tuple of its symbols in the order they are pushed on the parsing stack, () for EPSILON and
+    None if the terminal is a syntax error.
+    """
+
+    def __init__(self, grammar, first, follow, nullable):
+        non_terminals = [non_terminal for non_terminal in grammar if non_terminal != 'TERMINALS']
+        self.names = TERMINALS + non_terminals
+        self.ids = {name: symbol for symbol, name in enumerate(self.names)}
+        self.terminal_count = len(TERMINALS)
+        # one more column than there are terminals, it is always None. a token that is no terminal of the grammar
+        # has the id -1 and lands on the extra column of the row before.
+        self.width = self.terminal_count + 1
+        self.productions = [None] * (len(non_terminals) * self.width)
+        for row, non_terminal in enumerate(non_terminals):
+            for terminal in range(self.terminal_count):
+                self.productions[row * self.width + terminal] = self.choose(grammar[non_terminal]['Rules'], terminal,
+                                                                            first, follow, nullable, non_terminal)
+        self.start = self.ids['Program']
+
+    def choose(self, rules, terminal, first, follow, nullable, non_terminal):
+        """
+        this function will return the production of the first rule that matches terminal, the rules are tried in the
+        order of grammar.txt like the parser did before it had a table
+        """
+        for rule in rules.values():
+            if rule[0] == 'EPSILON':
+                if terminal in follow[non_terminal]:
+                    return ()
+            elif rule[0] in TERMINAL_IDS:
+                if terminal == TERMINAL_IDS[rule[0]]:
+                    return tuple(self.ids[symbol] for symbol in reversed(rule))
+            elif terminal in first[rule[0]] or rule[0] in nullable and terminal in follow[rule[0]]:
+                return tuple(self.ids[symbol] for symbol in reversed(rule))
+        return None
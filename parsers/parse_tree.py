@@ -0,0 +1,146 @@
+from array import array
+
+from scanner.tokens import TokenView
+
+NO_NODE = -1
+TOKEN_KIND = -1  # the kind of a node that holds a token, its name is the token
+VERTICAL, CONTINUE, END = '│   ', '├── ', '└── '  # the ContStyle of anytree
+
+
+class ParseTree:
+    """
+    a parse tree stored in parallel arrays, a node is the index of its entries in them. next to the kind, parent,
+    first child, next sibling and token of every node there is the last child, so a child is added at the end of
+    its parent in constant time. a token node keeps the index of its token in the tokens of the scanner result.
+    the parsers create nodes with add and take them out of the tree with detach, like Node(name, parent) and
+    node.parent = None did with anytree.
+    """
+
+    def __init__(self, result):
+        self.kinds = array('i')  # index in kind_names, or TOKEN_KIND
+        self.parents = array('i')
+        self.first_children = array('i')
+        self.last_children = array('i')
+        self.next_siblings = array('i')
+        self.token_indexes = array('i')  # index in result.tokens, or NO_NODE
+        self.kind_names = []
+        self.kind_ids = {}
+        self.result = result  # the ScannerResult of the parser, a cached reader swaps its tokens on the first token
+        self.root = 0
+
+    def add(self, name, parent=None):
+        """
+        this function will add a node as the last child of parent and return it, name is a grammar symbol or a token
+        """
+        node = len(self.kinds)
+        token_index = NO_NODE
+        if name.__class__ is not str:
+            token_index = name.index
+            if token_index < 0:  # the END token is not kept in the tokens, its node is named like a grammar symbol
+                name = repr(name)
+        if token_index < 0:
+            kind = self.kind_ids.get(name)
+            if kind is None:
+                kind = self.kind_ids[name] = len(self.kind_names)
+                self.kind_names.append(name)
+            self.kinds.append(kind)
+        else:
+            self.kinds.append(TOKEN_KIND)
+        self.token_indexes.append(token_index)
+        self.first_children.append(NO_NODE)
+        self.last_children.append(NO_NODE)
+        self.next_siblings.append(NO_NODE)
+        if parent is None:
+            self.parents.append(NO_NODE)
+        else:
+            self.parents.append(parent)
+            last = self.last_children[parent]
+            if last == NO_NODE:
+                self.first_children[parent] = node
+            else:
+                self.next_siblings[last] = node
+            self.last_children[parent] = node
+        return node
+
+    def detach(self, node):
+        """
+        this function will take a node out of the tree and return its old parent, or None if it had none
+        """
+        parent = self.parents[node]
+        if parent == NO_NODE:
+            return None
+        previous, child = NO_NODE, self.first_children[parent]
+        while child != node:  # it is mostly the last child of a few
+            previous, child = child, self.next_siblings[child]
+        if previous == NO_NODE:
+            self.first_children[parent] = self.next_siblings[node]
+        else:
+            self.next_siblings[previous] = self.next_siblings[node]
+        if self.last_children[parent] == node:
+            self.last_children[parent] = previous
+        self.parents[node] = NO_NODE
+        self.next_siblings[node] = NO_NODE
+        return parent
+
+    def name(self, node):
+        kind = self.kinds[node]
+        if kind == TOKEN_KIND:
+            return repr(TokenView(self.result.tokens, self.token_indexes[node]))
+        return self.kind_names[kind]
+
+    def children(self, node):
+        children = []
+        child = self.first_children[node]
+        while child != NO_NODE:
+            children.append(child)
+            child = self.next_siblings[child]
+        return children
+
+    def render(self):
+        """
+        this function will return the tree under root the way RenderTree of anytree printed it, one line per node.
+        a tree whose start symbol was taken out by error recovery is empty.
+        """
+        if self.root == NO_NODE:
+            return ''
+        lines = []
+        stack = [(self.root, '', '')]
+        while stack:
+            node, prefix, indent = stack.pop()
+            lines.append(prefix + self.name(node))
+            children = self.children(node)
+            if children:
+                stack.append((children[-1], indent + END, indent + '    '))
+                stack.extend((child, indent + CONTINUE, indent + VERTICAL) for child in reversed(children[:-1]))
+        return '\n'.join(lines)
+
+
+def parse_result(tree, root):
+    """
+    this function will return the tree of a parser with its root set, or None if the parser built no tree
+    """
+    if tree is None:
+        return None
+    tree.root = root
+    return tree
+
+
+def no_node(name, parent=None):
+    """
+    stands in for ParseTree.add when no parse tree is built, the parsers then pass None around instead of nodes
+    """
+    return None
+
+
+def no_detach(node):
+    return None
+
+
+def tree_functions(tree):
+    """
+    this function will return the (new node, detach) functions of a parser that builds tree, tree is None if it
+    builds no tree
+    """
+    if tree is not None:
+        return tree.add, tree.detach
+    return no_node, no_detach
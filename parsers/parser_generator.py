@@ -0,0 +1,155 @@
+"""
+generates the parse_* methods of the transition diagram parser from parsers/grammar_with_symbol.txt.
+the generated module is cached in parsers/__pycache__ under a hash of the grammar and this generator, so it is only
+written again when one of them changes.
+"""
+import hashlib
+import importlib.util
+import os
+import types
+
+from parsers.grammar_analysis import GrammarAnalysis
+from scanner.terminals import GRAMMAR_FILE, EPSILON, TERMINAL_IDS
+
+SYMBOL_GRAMMAR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grammar_with_symbol.txt')
+CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '__pycache__')
+ACTION = 'action'  # the second item of a semantic action on the parsing stack, where the others have their node
+
+
+def read_symbol_grammar(file_name=SYMBOL_GRAMMAR_FILE):
+    """
+    this function will return the rules of grammar_with_symbol.txt as a dict of non terminal -> list of alternatives,
+    the alternatives keep their #action symbols
+    """
+    rules = {}
+    with open(file_name) as f:
+        for line in f:
+            if '->' not in line:
+                continue
+            non_terminal, alternatives = line.split('->', 1)
+            rules.setdefault(non_terminal.strip(), []).extend(
+                alternative.split() for alternative in alternatives.split('|'))
+    return rules
+
+
+def is_action(symbol):
+    return symbol.startswith('#')
+
+
+def method_name(non_terminal):
+    return 'parse_' + non_terminal.replace('-', '_')
+
+
+def action_name(action):
+    return 'ACTION_' + action[1:]
+
+
+def condition(terminals):
+    """
+    this function will return the test of a set of terminal ids as python source, on the local variable terminal
+    """
+    if len(terminals) == 1:
+        return f'terminal == {next(iter(terminals))}'
+    return f'terminal in {{{", ".join(map(str, sorted(terminals)))}}}'
+
+
+def bits_to_ids(bits):
+    return {terminal_id for terminal_id in range(bits.bit_length()) if bits >> terminal_id & 1}
+
+
+def generate(rules):
+    """
+    this function will return the source of a module with a Productions class, it has a parse_* method for every
+    non terminal that does what the hand written methods of TransitionDiagram did: it picks an alternative by the
+    terminal id of the current token and pushes its symbols on the parsing stack in reverse order. terminals are
+    pushed as (terminal id, node), non terminals as (parse method, node) and actions as (action, ACTION).
+    """
+    analysis = GrammarAnalysis({non_terminal: [[symbol for symbol in alternative if not is_action(symbol)]
+                                               for alternative in alternatives]
+                                for non_terminal, alternatives in rules.items()})
+    start = next(iter(rules))
+    actions = sorted({symbol for alternatives in rules.values() for alternative in alternatives
+                      for symbol in alternative if is_action(symbol)})
+    lines = [
+        '# generated by parsers/parser_generator.py from grammar_with_symbol.txt, do not edit',
+        'from parsers.code_generator_recursive import SEMANTIC_ACTIONS',
+        'from parsers.parser_generator import ACTION',
+        '',
+    ]
+    lines += [f"{action_name(action)} = SEMANTIC_ACTIONS['{action}']" for action in actions]
+    lines += ['', '', 'class Productions:']
+    for non_terminal, alternatives in rules.items():
+        lines += ['', f'    def {method_name(non_terminal)}(self, node):',
+                  '        token = self.current_token or self.get_next_parse_token()',
+                  '        terminal = token.terminal']
+        if non_terminal != start:  # the node of the start symbol is the root of the tree
+            lines.append(f'        node = self.new_node("{non_terminal}", node)')
+        keyword = 'if'
+        for alternative in alternatives:
+            symbols = [symbol for symbol in alternative if not is_action(symbol)]
+            lines.append(f'        # {non_terminal} -> {" ".join(alternative)}')
+            if symbols[0] == EPSILON:
+                test = condition(bits_to_ids(analysis.follow[non_terminal]))
+            elif symbols[0] in TERMINAL_IDS:
+                test = condition({TERMINAL_IDS[symbols[0]]})
+            else:  # like is_in_first, with the Follow of a non terminal that can be empty
+                bits = analysis.first[symbols[0]]
+                if symbols[0] in analysis.nullable:
+                    bits |= analysis.follow[symbols[0]]
+                test = condition(bits_to_ids(bits))
+            lines.append(f'        {keyword} {test}:')
+            keyword = 'elif'
+            if symbols[0] == EPSILON:
+                lines.append('            self.new_node("epsilon", node)')
+            pushes = []
+            for symbol in reversed(alternative):
+                if is_action(symbol):
+                    pushes.append(f'({action_name(symbol)}, ACTION)')
+                elif symbol in TERMINAL_IDS:
+                    pushes.append(f'({TERMINAL_IDS[symbol]}, node)')
+                elif symbol != EPSILON:
+                    pushes.append(f'(self.{method_name(symbol)}, node)')
+            if len(pushes) == 1:
+                lines.append(f'            self.parsing_stack.append({pushes[0]})')
+            elif pushes:
+                lines.append(f'            self.parsing_stack.extend(({", ".join(pushes)}))')
+        lines += ['        else:  # error',
+                  f"            self.handle_error_non_terminal('{non_terminal}', token, self.{method_name(non_terminal)},"
+                  f' node)']
+    return '\n'.join(lines) + '\n'
+
+
+def grammar_hash(*file_names):
+    digest = hashlib.sha256()
+    for file_name in file_names:
+        with open(file_name, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_parser(file_name=SYMBOL_GRAMMAR_FILE, directory=CACHE_DIRECTORY):
+    """
+    this function will return the generated module of the grammar, it is generated and written to the cache directory
+    only if there is no module for the current grammar yet
+    """
+    key = grammar_hash(__file__, file_name, GRAMMAR_FILE)[:16]  # the terminal ids come from grammar.txt
+    module_name = f'transition_diagram_{key}'
+    path = os.path.join(directory, module_name + '.py')
+    if not os.path.exists(path):
+        source = generate(read_symbol_grammar(file_name))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(path + '.tmp', 'w') as f:
+                f.write(source)
+            os.replace(path + '.tmp', path)
+            for name in os.listdir(directory):  # modules of older grammars
+                if name.startswith('transition_diagram_') and name != module_name + '.py':
+                    os.remove(os.path.join(directory, name))
+        except OSError:  # a read only install, the module is generated in memory
+            module = types.ModuleType(module_name)
+            exec(compile(source, module_name, 'exec'), module.__dict__)
+            return module
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
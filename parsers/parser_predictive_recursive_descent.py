@@ -1,41 +1,78 @@
-import json
 from scanner import Reader, ScannerResult, get_next_token
-from anytree import Node
+from parsers.parse_tree import ParseTree, parse_result, tree_functions
+from parsers.grammar_analysis import parser_grammar
 from scanner.const import TokenType
-
-
-def parse_predictive_recursive_descent():
-    t = PredictiveRecursiveDescent(Reader('input.txt'), ScannerResult())
+from scanner.terminals import TERMINAL_IDS, TERMINALS
+from scanner.token_stream import TokenStream
+
+# the terminal ids the parse methods compare tokens with, looked up once here
+OPEN_PARENTHESIS = TERMINAL_IDS['(']
+CLOSE_PARENTHESIS = TERMINAL_IDS[')']
+TIMES = TERMINAL_IDS['*']
+PLUS = TERMINAL_IDS['+']
+COMMA = TERMINAL_IDS[',']
+MINUS = TERMINAL_IDS['-']
+SEMICOLON = TERMINAL_IDS[';']
+LESS = TERMINAL_IDS['<']
+ASSIGN = TERMINAL_IDS['=']
+EQUALS = TERMINAL_IDS['==']
+ID = TERMINAL_IDS['ID']
+NUM = TERMINAL_IDS['NUM']
+OPEN_BRACKET = TERMINAL_IDS['[']
+CLOSE_BRACKET = TERMINAL_IDS[']']
+OPEN_BRACE = TERMINAL_IDS['{']
+CLOSE_BRACE = TERMINAL_IDS['}']
+INT = TERMINAL_IDS['int']
+ENDIF = TERMINAL_IDS['endif']
+BREAK = TERMINAL_IDS['break']
+REPEAT = TERMINAL_IDS['repeat']
+ELSE = TERMINAL_IDS['else']
+IF = TERMINAL_IDS['if']
+UNTIL = TERMINAL_IDS['until']
+RETURN = TERMINAL_IDS['return']
+VOID = TERMINAL_IDS['void']
+
+
+def parse_predictive_recursive_descent(scanner=get_next_token, reader_class=Reader, result_class=ScannerResult,
+                                       build_tree=True):
+    t = PredictiveRecursiveDescent(reader_class('input.txt'), result_class(), scanner, build_tree)
     tree, errors = t.parse()
     return tree, errors
 
 
 class PredictiveRecursiveDescent:
 
-    def __init__(self, reader, out):
+    def __init__(self, reader, out, scanner=get_next_token, build_tree=True):
         self.reader = reader
         self.out = out
+        self.scanner = scanner
+        self.tokens = TokenStream(reader, out, scanner)
         self.current_token = None
-        self.grammar = json.load(open('parsers/grammar.json'))
+        self.tree = ParseTree(out) if build_tree else None  # no parse tree at all if only the errors are needed
+        self.new_node, self.detach = tree_functions(self.tree)
+        grammar = parser_grammar()
+        self.grammar = grammar.layout
+        # the tokens carry their terminal id from the scanner, so First and Follow are sets of ids
+        self.first, self.follow, self.nullable = grammar.first, grammar.follow, grammar.nullable
         self.errors = []
         self.parsing_EOF = True  # will be set to False when unexpected EOF occurs
 
     def parse(self):
-        tree = self.parse_Program()
-        return tree, self.errors
+        root = self.parse_Program()
+        return parse_result(self.tree, root), self.errors
 
     def parse_Program(self):
         token = self.get_terminal()
-        root = Node("Program")
+        root = self.new_node("Program")
         self.root = root
 
         # Program -> Declaration-list $
         if self.is_in_first('Declaration-list', token):
             self.parse_Declaration_list(root)
             if self.parsing_EOF:
-                Node("$", parent=root)
+                self.new_node("$", parent=root)
         else:  # error
-            root = Node("Program")
+            root = self.new_node("Program")
             if not self.handle_error_non_terminal('Program', token):
                 self.parse_Program(root)
         return root
@@ -44,18 +81,17 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Declaration-list", parent=node)
+        node = self.new_node("Declaration-list", parent=node)
 
         # Declaration-list -> Declaration Declaration-list
         if self.is_in_first('Declaration', token):
             self.parse_Declaration(node)
             self.parse_Declaration_list(node)
         # Declaration-list -> EPSILON
-        elif token.get_terminal_form() in self.grammar['Declaration']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['Declaration']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Declaration_list', token):
                 self.parse_Declaration_list(parent)
 
@@ -63,15 +99,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Declaration", parent=node)
+        node = self.new_node("Declaration", parent=node)
 
         # Declaration -> Declaration-initial Declaration-prime
         if self.is_in_first('Declaration-initial', token):
             self.parse_Declaration_initial(node)
             self.parse_Declaration_prime(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Declaration', token):
                 self.parse_Declaration(parent)
 
@@ -79,15 +114,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Declaration-initial", parent=node)
+        node = self.new_node("Declaration-initial", parent=node)
 
         # Declaration-initial ->  Type-specifier ID
         if self.is_in_first('Type-specifier', token):
             self.parse_Type_specifier(node)
-            self.match_terminal('ID', node)
+            self.match_terminal(ID, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Declaration-initial', token):
                 self.parse_Declaration_initial(parent)
 
@@ -95,7 +129,7 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Declaration-prime", parent=node)
+        node = self.new_node("Declaration-prime", parent=node)
 
         # Declaration-prime -> Fun-declaration-prime
         if self.is_in_first('Fun-declaration-prime', token):
@@ -104,8 +138,7 @@ class PredictiveRecursiveDescent:
         elif self.is_in_first('Var-declaration-prime', token):
             self.parse_Var_declaration_prime(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Declaration-prime', token):
                 self.parse_Declaration_prime(parent)
 
@@ -113,20 +146,19 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Var-declaration-prime", parent=node)
+        node = self.new_node("Var-declaration-prime", parent=node)
 
         # Var-declaration-prime -> ;
-        if token.get_terminal_form() == ';':
-            self.match_terminal(';', node)
+        if token.terminal == SEMICOLON:
+            self.match_terminal(SEMICOLON, node)
         # Var-declaration-prime -> [ NUM ] ;
-        elif token.get_terminal_form() == '[':
-            self.match_terminal('[', node)
-            self.match_terminal('NUM', node)
-            self.match_terminal(']', node)
-            self.match_terminal(';', node)
-        else:  # error
-            parent = node.parent
-            node.parent = None
+        elif token.terminal == OPEN_BRACKET:
+            self.match_terminal(OPEN_BRACKET, node)
+            self.match_terminal(NUM, node)
+            self.match_terminal(CLOSE_BRACKET, node)
+            self.match_terminal(SEMICOLON, node)
+        else:  # error
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Var-declaration-prime', token):
                 self.parse_Var_declaration_prime(parent)
 
@@ -134,17 +166,16 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Fun-declaration-prime", parent=node)
+        node = self.new_node("Fun-declaration-prime", parent=node)
 
         # Fun-declaration-prime ->  ( Params ) Compound-stmt
-        if token.get_terminal_form() == '(':
-            self.match_terminal('(', node)
+        if token.terminal == OPEN_PARENTHESIS:
+            self.match_terminal(OPEN_PARENTHESIS, node)
             self.parse_Params(node)
-            self.match_terminal(')', node)
+            self.match_terminal(CLOSE_PARENTHESIS, node)
             self.parse_Compound_stmt(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Fun-declaration-prime', token):
                 self.parse_Fun_declaration_prime(parent)
 
@@ -152,17 +183,16 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Type-specifier", parent=node)
+        node = self.new_node("Type-specifier", parent=node)
 
         # Type - specifier -> int
-        if token.get_terminal_form() == 'int':
-            self.match_terminal('int', node)
+        if token.terminal == INT:
+            self.match_terminal(INT, node)
         # Type - specifier -> void
-        elif token.get_terminal_form() == 'void':
-            self.match_terminal('void', node)
+        elif token.terminal == VOID:
+            self.match_terminal(VOID, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Type-specifier', token):
                 self.parse_Type_specifier(parent)
 
@@ -170,20 +200,19 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Params", parent=node)
+        node = self.new_node("Params", parent=node)
 
         # Params -> int ID Param-prime Param-list
-        if token.get_terminal_form() == 'int':
-            self.match_terminal('int', node)
-            self.match_terminal('ID', node)
+        if token.terminal == INT:
+            self.match_terminal(INT, node)
+            self.match_terminal(ID, node)
             self.parse_Param_prime(node)
             self.parse_Param_list(node)
         # Params -> void
-        elif token.get_terminal_form() == 'void':
-            self.match_terminal('void', node)
+        elif token.terminal == VOID:
+            self.match_terminal(VOID, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Params', token):
                 self.parse_Params(parent)
 
@@ -191,19 +220,18 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Param-list", parent=node)
+        node = self.new_node("Param-list", parent=node)
 
         # Param-list -> , Param Param-list
-        if token.get_terminal_form() == ',':
-            self.match_terminal(',', node)
+        if token.terminal == COMMA:
+            self.match_terminal(COMMA, node)
             self.parse_Param(node)
             self.parse_Param_list(node)
         # Param-list -> EPSILON
-        elif token.get_terminal_form() in self.grammar['Param-list']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['Param-list']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Param-list', token):
                 self.parse_Param_list(parent)
 
@@ -211,15 +239,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Param", parent=node)
+        node = self.new_node("Param", parent=node)
 
         # Param -> Declaration-initial Param-prime
         if self.is_in_first('Declaration-initial', token):
             self.parse_Declaration_initial(node)
             self.parse_Param_prime(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Param', token):
                 self.parse_Param(parent)
 
@@ -227,18 +254,17 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Param-prime", parent=node)
+        node = self.new_node("Param-prime", parent=node)
 
         # Param-prime -> [  ]
-        if token.get_terminal_form() == '[':
-            self.match_terminal('[', node)
-            self.match_terminal(']', node)
+        if token.terminal == OPEN_BRACKET:
+            self.match_terminal(OPEN_BRACKET, node)
+            self.match_terminal(CLOSE_BRACKET, node)
         # Param-list -> EPSILON
-        elif token.get_terminal_form() in self.grammar['Param-prime']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['Param-prime']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Param-prime', token):
                 self.parse_Param_prime(parent)
 
@@ -246,17 +272,16 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Compound-stmt", parent=node)
+        node = self.new_node("Compound-stmt", parent=node)
 
         # Compound-stmt -> { Declaration-list Statement-list }
-        if token.get_terminal_form() == '{':
-            self.match_terminal('{', node)
+        if token.terminal == OPEN_BRACE:
+            self.match_terminal(OPEN_BRACE, node)
             self.parse_Declaration_list(node)
             self.parse_Statement_list(node)
-            self.match_terminal('}', node)
+            self.match_terminal(CLOSE_BRACE, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Compound-stmt', token):
                 self.parse_Compound_stmt(parent)
 
@@ -264,18 +289,17 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Statement-list", parent=node)
+        node = self.new_node("Statement-list", parent=node)
 
         # Statement-list -> Statement Statement-list
         if self.is_in_first('Statement', token):
             self.parse_Statement(node)
             self.parse_Statement_list(node)
         # Statement-list -> EPSILON
-        elif token.get_terminal_form() in self.grammar['Statement-list']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['Statement-list']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Statement-list', token):
                 self.parse_Statement_list(parent)
 
@@ -283,7 +307,7 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Statement", parent=node)
+        node = self.new_node("Statement", parent=node)
 
         # Statement -> Expression-stmt
         if self.is_in_first('Expression-stmt', token):
@@ -301,8 +325,7 @@ class PredictiveRecursiveDescent:
         elif self.is_in_first('Return-stmt', token):
             self.parse_Return_stmt(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Statement', token):
                 self.parse_Statement(parent)
 
@@ -310,22 +333,21 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Expression-stmt", parent=node)
+        node = self.new_node("Expression-stmt", parent=node)
 
         # Expression-stmt -> Expression ;
         if self.is_in_first('Expression', token):
             self.parse_Expression(node)
-            self.match_terminal(';', node)
+            self.match_terminal(SEMICOLON, node)
         # Expression-stmt -> break ;
-        elif token.get_terminal_form() == 'break':
-            self.match_terminal('break', node)
-            self.match_terminal(';', node)
+        elif token.terminal == BREAK:
+            self.match_terminal(BREAK, node)
+            self.match_terminal(SEMICOLON, node)
         #  Expression-stmt -> ;
-        elif token.get_terminal_form() == ';':
-            self.match_terminal(';', node)
+        elif token.terminal == SEMICOLON:
+            self.match_terminal(SEMICOLON, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Expression-stmt', token):
                 self.parse_Expression_stmt(parent)
 
@@ -333,19 +355,18 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Selection-stmt", parent=node)
+        node = self.new_node("Selection-stmt", parent=node)
 
         # Selection-stmt -> if ( Expression ) Statement Else-stmt
-        if token.get_terminal_form() == 'if':
-            self.match_terminal('if', node)
-            self.match_terminal('(', node)
+        if token.terminal == IF:
+            self.match_terminal(IF, node)
+            self.match_terminal(OPEN_PARENTHESIS, node)
             self.parse_Expression(node)
-            self.match_terminal(')', node)
+            self.match_terminal(CLOSE_PARENTHESIS, node)
             self.parse_Statement(node)
             self.parse_Else_stmt(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Selection-stmt', token):
                 self.parse_Selection_stmt(parent)
 
@@ -353,19 +374,18 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Else-stmt", parent=node)
+        node = self.new_node("Else-stmt", parent=node)
 
         # Else-stmt -> endif
-        if token.get_terminal_form() == 'endif':
-            self.match_terminal('endif', node)
+        if token.terminal == ENDIF:
+            self.match_terminal(ENDIF, node)
         #  Else-stmt -> else Statement endif
-        elif token.get_terminal_form() == 'else':
-            self.match_terminal('else', node)
+        elif token.terminal == ELSE:
+            self.match_terminal(ELSE, node)
             self.parse_Statement(node)
-            self.match_terminal('endif', node)
+            self.match_terminal(ENDIF, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Else-stmt', token):
                 self.parse_Else_stmt(parent)
 
@@ -373,19 +393,18 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Iteration-stmt", parent=node)
+        node = self.new_node("Iteration-stmt", parent=node)
 
         # Iteration-stmt -> repeat Statement until ( Expression )
-        if token.get_terminal_form() == 'repeat':
-            self.match_terminal('repeat', node)
+        if token.terminal == REPEAT:
+            self.match_terminal(REPEAT, node)
             self.parse_Statement(node)
-            self.match_terminal('until', node)
-            self.match_terminal('(', node)
+            self.match_terminal(UNTIL, node)
+            self.match_terminal(OPEN_PARENTHESIS, node)
             self.parse_Expression(node)
-            self.match_terminal(')', node)
+            self.match_terminal(CLOSE_PARENTHESIS, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Iteration-stmt', token):
                 self.parse_Iteration_stmt(parent)
 
@@ -393,15 +412,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Return-stmt", parent=node)
+        node = self.new_node("Return-stmt", parent=node)
 
         # Return-stmt -> return Return-stmt-prime
-        if token.get_terminal_form() == 'return':
-            self.match_terminal('return', node)
+        if token.terminal == RETURN:
+            self.match_terminal(RETURN, node)
             self.parse_Return_stmt_prime(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Return-stmt', token):
                 self.parse_Return_stmt(parent)
 
@@ -409,18 +427,17 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Return-stmt-prime", parent=node)
+        node = self.new_node("Return-stmt-prime", parent=node)
 
         # Return-stmt-prime -> ;
-        if token.get_terminal_form() == ';':
-            self.match_terminal(';', node)
+        if token.terminal == SEMICOLON:
+            self.match_terminal(SEMICOLON, node)
         # Return-stmt-prime -> Expression ;
         elif self.is_in_first('Expression', token):
             self.parse_Expression(node)
-            self.match_terminal(';', node)
+            self.match_terminal(SEMICOLON, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Return-stmt-prime', token):
                 self.parse_Return_stmt_prime(parent)
 
@@ -428,18 +445,17 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Expression", parent=node)
+        node = self.new_node("Expression", parent=node)
 
         # Expression -> Simple-expression-zegond | ID B
         if self.is_in_first('Simple-expression-zegond', token):
             self.parse_Simple_expression_zegond(node)
         # Expression -> ID B
-        elif token.get_terminal_form() == 'ID':
-            self.match_terminal('ID', node)
+        elif token.terminal == ID:
+            self.match_terminal(ID, node)
             self.parse_B(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Expression', token):
                 self.parse_Expression(parent)
 
@@ -447,24 +463,23 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("B", parent=node)
+        node = self.new_node("B", parent=node)
 
         # B -> = Expression
-        if token.get_terminal_form() == '=':
-            self.match_terminal('=', node)
+        if token.terminal == ASSIGN:
+            self.match_terminal(ASSIGN, node)
             self.parse_Expression(node)
         # B -> [ Expression ] H
-        elif token.get_terminal_form() == '[':
-            self.match_terminal('[', node)
+        elif token.terminal == OPEN_BRACKET:
+            self.match_terminal(OPEN_BRACKET, node)
             self.parse_Expression(node)
-            self.match_terminal(']', node)
+            self.match_terminal(CLOSE_BRACKET, node)
             self.parse_H(node)
         # B -> Simple-expression-prime
         elif self.is_in_first('Simple-expression-prime', token):
             self.parse_Simple_expression_prime(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('B', token):
                 self.parse_B(parent)
 
@@ -472,11 +487,11 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("H", parent=node)
+        node = self.new_node("H", parent=node)
 
         # H -> = Expression
-        if token.get_terminal_form() == '=':
-            self.match_terminal('=', node)
+        if token.terminal == ASSIGN:
+            self.match_terminal(ASSIGN, node)
             self.parse_Expression(node)
         # H -> G D C
         elif self.is_in_first('G', token):
@@ -484,8 +499,7 @@ class PredictiveRecursiveDescent:
             self.parse_D(node)
             self.parse_C(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('H', token):
                 self.parse_H(parent)
 
@@ -493,15 +507,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Simple-expression-zegond", parent=node)
+        node = self.new_node("Simple-expression-zegond", parent=node)
 
         # Simple-expression-zegond -> Additive-expression-zegond C
         if self.is_in_first('Additive-expression-zegond', token):
             self.parse_Additive_expression_zegond(node)
             self.parse_C(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Simple-expression-zegond', token):
                 self.parse_Simple_expression_zegond(parent)
 
@@ -509,15 +522,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Simple-expression-prime", parent=node)
+        node = self.new_node("Simple-expression-prime", parent=node)
 
         # Simple-expression-prime -> Additive-expression-prime C
         if self.is_in_first('Additive-expression-prime', token):
             self.parse_Additive_expression_prime(node)
             self.parse_C(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Simple-expression-prime', token):
                 self.parse_Simple_expression_prime(parent)
 
@@ -525,18 +537,17 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("C", parent=node)
+        node = self.new_node("C", parent=node)
 
         # C -> Relop Additive-expression
         if self.is_in_first('Relop', token):
             self.parse_Relop(node)
             self.parse_Additive_expression(node)
         # C -> EPSILON
-        elif token.get_terminal_form() in self.grammar['C']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['C']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('C', token):
                 self.parse_C(parent)
 
@@ -544,17 +555,16 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Relop", parent=node)
+        node = self.new_node("Relop", parent=node)
 
         # Relop -> <
-        if token.get_terminal_form() == '<':
-            self.match_terminal('<', node)
+        if token.terminal == LESS:
+            self.match_terminal(LESS, node)
         # Relop -> ==
-        elif token.get_terminal_form() == '==':
-            self.match_terminal('==', node)
+        elif token.terminal == EQUALS:
+            self.match_terminal(EQUALS, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Relop', token):
                 self.parse_Relop(parent)
 
@@ -562,15 +572,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Additive-expression", parent=node)
+        node = self.new_node("Additive-expression", parent=node)
 
         # Additive-expression -> Term D
         if self.is_in_first('Term', token):
             self.parse_Term(node)
             self.parse_D(node)
         else:  # errors
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Additive-expression', token):
                 self.parse_Additive_expression(parent)
 
@@ -578,15 +587,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Additive-expression-prime", parent=node)
+        node = self.new_node("Additive-expression-prime", parent=node)
 
         # Additive-expression-prime -> Term-prime D
         if self.is_in_first('Term-prime', token):
             self.parse_Term_prime(node)
             self.parse_D(node)
         else:  # errors
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Additive-expression-prime', token):
                 self.parse_Additive_expression_prime(parent)
 
@@ -594,15 +602,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Additive-expression-zegond", parent=node)
+        node = self.new_node("Additive-expression-zegond", parent=node)
 
         # Additive-expression-zegond -> Term-zegond D
         if self.is_in_first('Term-zegond', token):
             self.parse_Term_zegond(node)
             self.parse_D(node)
         else:  # prime
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Additive-expression-zegond', token):
                 self.parse_Additive_expression_zegond(parent)
 
@@ -610,7 +617,7 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("D", parent=node)
+        node = self.new_node("D", parent=node)
 
         # D -> Addop Term D
         if self.is_in_first('Addop', token):
@@ -618,11 +625,10 @@ class PredictiveRecursiveDescent:
             self.parse_Term(node)
             self.parse_D(node)
         # D -> EPSILON
-        elif token.get_terminal_form() in self.grammar['D']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['D']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('D', token):
                 self.parse_D(parent)
 
@@ -630,17 +636,16 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Addop", parent=node)
+        node = self.new_node("Addop", parent=node)
 
         # Addop -> +
-        if token.get_terminal_form() == '+':
-            self.match_terminal('+', node)
+        if token.terminal == PLUS:
+            self.match_terminal(PLUS, node)
         # Addop -> -
-        elif token.get_terminal_form() == '-':
-            self.match_terminal('-', node)
+        elif token.terminal == MINUS:
+            self.match_terminal(MINUS, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Addop', token):
                 self.parse_Addop(parent)
 
@@ -648,15 +653,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Term", parent=node)
+        node = self.new_node("Term", parent=node)
 
         # Term -> Factor G
         if self.is_in_first('Factor', token):
             self.parse_Factor(node)
             self.parse_G(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Term', token):
                 self.parse_Term(parent)
 
@@ -664,15 +668,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Term-prime", parent=node)
+        node = self.new_node("Term-prime", parent=node)
 
         # Term-prime -> Factor-prime G
         if self.is_in_first('Factor-prime', token):
             self.parse_Factor_prime(node)
             self.parse_G(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Term-prime', token):
                 self.parse_Term_prime(parent)
 
@@ -680,15 +683,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Term-zegond", parent=node)
+        node = self.new_node("Term-zegond", parent=node)
 
         # Term-zegond -> Factor-zegond G
         if self.is_in_first('Factor-zegond', token):
             self.parse_Factor_zegond(node)
             self.parse_G(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Term-zegond', token):
                 self.parse_Term_zegond(parent)
 
@@ -696,19 +698,18 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("G", parent=node)
+        node = self.new_node("G", parent=node)
 
         # G -> * Factor G
-        if token.get_terminal_form() == '*':
-            self.match_terminal('*', node)
+        if token.terminal == TIMES:
+            self.match_terminal(TIMES, node)
             self.parse_Factor(node)
             self.parse_G(node)
         # G -> EPSILON
-        elif token.get_terminal_form() in self.grammar['G']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['G']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('G', token):
                 self.parse_G(parent)
 
@@ -716,23 +717,22 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Factor", parent=node)
+        node = self.new_node("Factor", parent=node)
 
         # Factor -> ( Expression )
-        if token.get_terminal_form() == '(':
-            self.match_terminal('(', node)
+        if token.terminal == OPEN_PARENTHESIS:
+            self.match_terminal(OPEN_PARENTHESIS, node)
             self.parse_Expression(node)
-            self.match_terminal(')', node)
+            self.match_terminal(CLOSE_PARENTHESIS, node)
         # Factor -> ID Var-call-prime
-        elif token.get_terminal_form() == 'ID':
-            self.match_terminal('ID', node)
+        elif token.terminal == ID:
+            self.match_terminal(ID, node)
             self.parse_Var_call_prime(node)
         # Factor -> NUM
-        elif token.get_terminal_form() == 'NUM':
-            self.match_terminal('NUM', node)
+        elif token.terminal == NUM:
+            self.match_terminal(NUM, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Factor', token):
                 self.parse_Factor(parent)
 
@@ -740,19 +740,18 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Var-call-prime", parent=node)
+        node = self.new_node("Var-call-prime", parent=node)
 
         # Var-call-prime -> ( Args )
-        if token.get_terminal_form() == '(':
-            self.match_terminal('(', node)
+        if token.terminal == OPEN_PARENTHESIS:
+            self.match_terminal(OPEN_PARENTHESIS, node)
             self.parse_Args(node)
-            self.match_terminal(')', node)
+            self.match_terminal(CLOSE_PARENTHESIS, node)
         # Var-call-prime -> Var-prime
         elif self.is_in_first('Var-prime', token):
             self.parse_Var_prime(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Var-call-prime', token):
                 self.parse_Var_call_prime(parent)
 
@@ -760,19 +759,18 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Var-prime", parent=node)
+        node = self.new_node("Var-prime", parent=node)
 
         # Var-prime -> [ Expression ]
-        if token.get_terminal_form() == '[':
-            self.match_terminal('[', node)
+        if token.terminal == OPEN_BRACKET:
+            self.match_terminal(OPEN_BRACKET, node)
             self.parse_Expression(node)
-            self.match_terminal(']', node)
+            self.match_terminal(CLOSE_BRACKET, node)
         # Var-prime -> EPSILON
-        elif token.get_terminal_form() in self.grammar['Var-prime']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['Var-prime']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Var-prime', token):
                 self.parse_Var_prime(parent)
 
@@ -780,19 +778,18 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Factor-prime", parent=node)
+        node = self.new_node("Factor-prime", parent=node)
 
         # Factor-prime -> ( Args )
-        if token.get_terminal_form() == '(':
-            self.match_terminal('(', node)
+        if token.terminal == OPEN_PARENTHESIS:
+            self.match_terminal(OPEN_PARENTHESIS, node)
             self.parse_Args(node)
-            self.match_terminal(')', node)
+            self.match_terminal(CLOSE_PARENTHESIS, node)
         # Factor-prime -> EPSILON
-        elif token.get_terminal_form() in self.grammar['Factor-prime']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['Factor-prime']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Factor-prime', token):
                 self.parse_Factor_prime(parent)
 
@@ -800,19 +797,18 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Factor-zegond", parent=node)
+        node = self.new_node("Factor-zegond", parent=node)
 
         # Factor-zegond -> ( Expression )
-        if token.get_terminal_form() == '(':
-            self.match_terminal('(', node)
+        if token.terminal == OPEN_PARENTHESIS:
+            self.match_terminal(OPEN_PARENTHESIS, node)
             self.parse_Expression(node)
-            self.match_terminal(')', node)
+            self.match_terminal(CLOSE_PARENTHESIS, node)
         # Factor-zegond -> NUM
-        elif token.get_terminal_form() == 'NUM':
-            self.match_terminal('NUM', node)
+        elif token.terminal == NUM:
+            self.match_terminal(NUM, node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Factor-zegond', token):
                 self.parse_Factor_zegond(parent)
 
@@ -820,17 +816,16 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Args", parent=node)
+        node = self.new_node("Args", parent=node)
 
         # Args -> Arg-list
         if self.is_in_first('Arg-list', token):
             self.parse_Arg_list(node)
         # Args -> EPSILON
-        elif token.get_terminal_form() in self.grammar['Args']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['Args']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Args', token):
                 self.parse_Args(parent)
 
@@ -838,15 +833,14 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Arg-list", parent=node)
+        node = self.new_node("Arg-list", parent=node)
 
         # Arg-list -> Expression Arg-list-prime
         if self.is_in_first('Expression', token):
             self.parse_Expression(node)
             self.parse_Arg_list_prime(node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Arg-list', token):
                 self.parse_Arg_list(parent)
 
@@ -854,24 +848,23 @@ class PredictiveRecursiveDescent:
         if not self.parsing_EOF:
             return
         token = self.get_terminal()
-        node = Node("Arg-list-prime", parent=node)
+        node = self.new_node("Arg-list-prime", parent=node)
 
         # Arg-list-prime -> , Expression Arg-list-prime | EPSILON
-        if token.get_terminal_form() == ',':
-            self.match_terminal(',', node)
+        if token.terminal == COMMA:
+            self.match_terminal(COMMA, node)
             self.parse_Expression(node)
             self.parse_Arg_list_prime(node)
         # Arg-list-prime -> EPSILON
-        elif token.get_terminal_form() in self.grammar['Arg-list-prime']['Follow']:
-            Node("epsilon", parent=node)
+        elif token.terminal in self.follow['Arg-list-prime']:
+            self.new_node("epsilon", parent=node)
         else:  # error
-            parent = node.parent
-            node.parent = None
+            parent = self.detach(node)
             if not self.handle_error_non_terminal('Arg-list-prime', token):
                 self.parse_Arg_list_prime(parent)
 
     def get_next_parse_token(self):
-        self.current_token = get_next_token(self.reader, self.out)
+        self.current_token = self.tokens.advance()
         return self.current_token
 
     def get_terminal(self):
@@ -883,19 +876,18 @@ class PredictiveRecursiveDescent:
 
     def match_terminal(self, terminal, node):
         self.get_terminal()
-        if self.current_token.get_terminal_form() == terminal:
-            Node(self.current_token, parent=node)
+        if self.current_token.terminal == terminal:
+            self.new_node(self.current_token, parent=node)
             self.current_token = None
         else:
             if self.parsing_EOF:
-                self.errors.append(f'#{self.current_token.line} : syntax error, missing {terminal}')
+                self.errors.append(f'#{self.current_token.line} : syntax error, missing {TERMINALS[terminal]}')
 
     def is_in_first(self, non_terminal, token):
-        return token.get_terminal_form() in self.grammar[non_terminal]['First'] or (
-                'EPSILON' in self.grammar[non_terminal]['First'])
+        return token.terminal in self.first[non_terminal] or non_terminal in self.nullable
 
     def is_in_follow(self, non_terminal, token):
-        return token.get_terminal_form() in self.grammar[non_terminal]['Follow']
+        return token.terminal in self.follow[non_terminal]
 
     def handle_error_non_terminal(self, non_terminal, token):
         """
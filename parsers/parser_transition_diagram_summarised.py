@@ -1,94 +1,79 @@
-import json
-
 from scanner import Reader, ScannerResult, get_next_token
-from anytree import Node
+from parsers.parse_tree import ParseTree, parse_result, tree_functions
+from parsers.grammar_analysis import parser_grammar
 from scanner.const import TokenType
+from scanner.token_stream import TokenStream
 
 
-def parse_transition_diagram_summarised():
-    t = TransitionDiagramSummary(Reader('input.txt'), ScannerResult())
+def parse_transition_diagram_summarised(scanner=get_next_token, reader_class=Reader, result_class=ScannerResult,
+                                        build_tree=True):
+    t = TransitionDiagramSummary(reader_class('input.txt'), result_class(), scanner, build_tree)
     tree, errors = t.parse()
     return tree, errors
 
 
 class TransitionDiagramSummary:
 
-    def __init__(self, reader, out):
+    def __init__(self, reader, out, scanner=get_next_token, build_tree=True):
         self.reader = reader
         self.out = out
+        self.scanner = scanner
+        self.tokens = TokenStream(reader, out, scanner)
         self.current_token = None
-        self.grammar = json.load(open('parsers/grammar.json'))
+        self.tree = ParseTree(out) if build_tree else None  # no parse tree at all if only the errors are needed
+        self.new_node, self.detach = tree_functions(self.tree)
+        grammar = parser_grammar()
+        self.grammar = grammar.layout
+        self.follow = grammar.follow  # Follow as sets of terminal ids, for the error messages
+        self.table = grammar.parse_table()
         self.errors = []
         self.parsing_EOF = False  # will be set to True when unexpected EOF occurs
         self.parsing_stack = []
 
     def parse(self):
-        root = Node("Program")
-        self.parsing_stack = [("Program", root)]
-        while self.parsing_stack and not self.parsing_EOF:
-            top_stack = self.parsing_stack.pop()
-            if top_stack[0] in self.grammar['TERMINALS'] or top_stack[0] == '$':
-                terminal, tree = top_stack
-                self.match_terminal(terminal, tree)
+        table = self.table
+        productions, width, terminal_count, names = table.productions, table.width, table.terminal_count, table.names
+        new_node = self.new_node
+        root = self.new_node("Program")
+        self.parsing_stack = [(table.start, root)]
+        stack = self.parsing_stack
+        while stack and not self.parsing_EOF:
+            symbol, tree = stack.pop()
+            token = self.current_token or self.get_next_parse_token()
+            if symbol < terminal_count:
+                if token.terminal == symbol:
+                    new_node(token, tree)
+                    self.current_token = None
+                else:
+                    self.errors.append(f'#{token.line} : syntax error, missing {names[symbol]}')
+                continue
+            node = new_node(names[symbol], tree)
+            production = productions[(symbol - terminal_count) * width + token.terminal]
+            if production is None:
+                self.handle_error_non_terminal(symbol, token, node)
+            elif production:
+                stack.extend([(next_symbol, node) for next_symbol in production])
             else:
-                non_terminal, tree = top_stack
-                node = Node(non_terminal, parent=tree)
-                rules = self.grammar[non_terminal]['Rules']
-                token = self.get_terminal()
-                flag_error = True
-                for _, rule in rules.items():
-                    if rule[0] == 'EPSILON' and token.get_terminal_form() in self.grammar[non_terminal]['Follow']:
-                        flag_error = False
-                        Node("epsilon", parent=node)
-                        break
-                    elif rule[0] != 'EPSILON' and \
-                            ((rule[0] in self.grammar['TERMINALS']
-                              and token.get_terminal_form() == rule[0]) or
-                             (rule[0] not in self.grammar['TERMINALS'] and self.is_in_first(rule[0], token))):
-                        flag_error = False
-                        for r in range(len(rule) - 1, -1, -1):
-                            self.parsing_stack.append((rule[r], node))
-                        break
-                if flag_error:
-                    self.handle_error_non_terminal(non_terminal, token, node)
-        return root.children[0], self.errors
+                new_node("epsilon", node)
+        if self.tree is not None:
+            root = self.tree.first_children[root]  # the node of the start symbol
+        return parse_result(self.tree, root), self.errors
 
     def get_next_parse_token(self):
-        self.current_token = get_next_token(self.reader, self.out)
+        self.current_token = self.tokens.advance()
         return self.current_token
 
-    def get_terminal(self):
-        if self.current_token:
-            return self.current_token
-        else:
-            self.get_next_parse_token()
-            return self.current_token
-
-    def match_terminal(self, terminal, node):
-        self.get_terminal()
-        if self.current_token.get_terminal_form() == terminal:
-            Node(self.current_token, parent=node)
-            self.current_token = None
-        else:
-            if not self.parsing_EOF:
-                self.errors.append(f'#{self.current_token.line} : syntax error, missing {terminal}')
-
-    def is_in_first(self, non_terminal, token):
-        return token.get_terminal_form() in self.grammar[non_terminal]['First'] or \
-               ('EPSILON' in self.grammar[non_terminal]['First'] and token.get_terminal_form() in
-                self.grammar[non_terminal]['Follow'])
-
     def is_in_follow(self, non_terminal, token):
-        return token.get_terminal_form() in self.grammar[non_terminal]['Follow']
+        return token.terminal in self.follow[non_terminal]
 
-    def handle_error_non_terminal(self, non_terminal, token, tree):
+    def handle_error_non_terminal(self, symbol, token, tree):
         """
         will add the correct error to the error list.
         if the output is true parsing should resume.
         if output is false the current non terminal procedure must be called again.
         """
-        parent = tree.parent
-        tree.parent = None
+        non_terminal = self.table.names[symbol]
+        parent = self.detach(tree)
         if self.current_token.content == '$' and self.current_token.type == TokenType.END:
             return True
 
@@ -104,5 +89,5 @@ class TransitionDiagramSummary:
                 self.errors.append(f'#{self.current_token.line} : syntax error, Unexpected EOF')
                 return True
 
-            self.parsing_stack.append((non_terminal, parent))
+            self.parsing_stack.append((symbol, parent))
             return False
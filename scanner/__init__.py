@@ -1,2 +1,30 @@
-from scanner.dfa import get_next_token
-from scanner.io import Reader, ScannerResult
\ No newline at end of file
+import functools
+
+from scanner.dfa import get_next_token, iter_tokens
+from scanner.io import Reader, ScannerResult, StreamReader, MmapReader, TextReader, StreamingResult
+from scanner import regex_scanner, vectorized
+
+# scanner engines selectable from compiler.py, all of them share the get_next_token(reader, result) contract
+SCANNERS = {
+    'dfa': get_next_token,
+    'regex': regex_scanner.get_next_token,
+    'regex-bulk': regex_scanner.get_next_token_bulk,  # one finditer over the buffer
+    'vector': vectorized.get_next_token,
+}
+
+# how the source file is read, 'stream' keeps memory bounded for huge inputs
+READERS = {
+    'file': Reader,
+    'stream': StreamReader,
+    'mmap': MmapReader,
+}
+
+
+def engine_reader(engine, reader_class):
+    """
+    this function will return the reader class to use with a scanner engine, the vector engine reads from readers
+    that run its numpy pre-pass
+    """
+    if engine == 'vector':
+        return functools.partial(vectorized.prepass_reader, reader_class=reader_class)
+    return reader_class
@@ -0,0 +1,197 @@
+"""
+micro-benchmark of the scanner engines on generated C-minus sources.
+run it from the project root with: python -m scanner.benchmark --sizes 1KB,1MB --output scanner_benchmark.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from scanner import SCANNERS, READERS, ScannerResult, engine_reader
+from scanner.const import TokenType
+
+UNITS = {'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30}
+NAMES = ['count', 'result', 'fact', 'a', 'b12', 'average', 'x', 'numbers', 'main', 'output', 'k2k2']
+TYPES = ['int', 'void']
+
+
+def identifier_line(rnd):
+    names = rnd.sample(NAMES, 3)
+    return rnd.choice([
+        f'{rnd.choice(TYPES)} {names[0]}{rnd.randint(0, 999)};',
+        f'{names[0]} = {names[1]} + {names[2]};',
+        f'if ({names[0]} < {names[1]}) {names[2]} = {names[0]}; else {names[2]} = {names[1]}; endif',
+        f'{names[0]}({names[1]}, {names[2]}[{names[0]}]);',
+    ])
+
+
+def number_line(rnd):
+    numbers = [str(rnd.randint(0, 10 ** rnd.randint(1, 9))) for _ in range(4)]
+    return f'x = {numbers[0]} + {numbers[1]} * {numbers[2]} - {numbers[3]};'
+
+
+def comment_line(rnd):
+    words = ' '.join(rnd.choice(NAMES) for _ in range(rnd.randint(3, 15)))
+    return rnd.choice([
+        f'/* {words} */',
+        f'// {words}',
+        f'/* {words}\n   {words} == * / */ {identifier_line(rnd)}',
+        f'{identifier_line(rnd)} // {words}',
+    ])
+
+
+def error_line(rnd):
+    return rnd.choice([
+        f'{rnd.choice(NAMES)} = 12{rnd.choice(NAMES)};',
+        f'{rnd.choice(NAMES)}# = @{rnd.randint(0, 99)};',
+        'a = b */ c;',
+        'x = / y; z = /# 3; $$ !',
+        f'int {rnd.choice(NAMES)}?;',
+    ])
+
+
+def symbol_line(rnd):
+    return rnd.choice([
+        'a==b;c=d*e;f=g==h;',
+        '{[(a)]}<b==c*=d;',
+        'x=*/y;/**/z**=w;',
+        'if(a==b){c=d*e;}else{}endif',
+        'a=b=c==d===e;',
+    ])
+
+
+CORPORA = {
+    'identifiers': identifier_line,
+    'numbers': number_line,
+    'comments': comment_line,
+    'errors': error_line,
+    'symbols': symbol_line,
+}
+
+
+def generate(corpus, size, seed=0):
+    """
+    this function will return a generated source of the given corpus of about size characters
+    """
+    rnd = random.Random(f'{corpus}-{seed}')
+    make_line = CORPORA[corpus]
+    lines = []
+    length = 0
+    while length < size:
+        line = make_line(rnd) + '\n'
+        lines.append(line)
+        length += len(line)
+    return ''.join(lines)[:size]
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    for unit, factor in UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+
+def scan(file_name, scanner, reader_class):
+    """
+    this function will scan a whole file and return the number of tokens and errors the scanner produced
+    """
+    reader = reader_class(file_name)
+    result = ScannerResult()
+    tokens = 1
+    while scanner(reader, result).type != TokenType.END:
+        tokens += 1
+    return tokens + sum(len(line_errors) for line_errors in result.lexical_errors)
+
+
+def measure(file_name, size, scanner, reader_class, repeat, memory):
+    seconds = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = scan(file_name, scanner, reader_class)
+        seconds = min(seconds, time.perf_counter() - start)
+    measurement = {
+        'tokens': tokens,
+        'seconds': round(seconds, 6),
+        'tokens_per_sec': round(tokens / seconds),
+        'mb_per_sec': round(size / (1 << 20) / seconds, 3),
+    }
+    if memory:  # tracemalloc slows everything down, so memory is measured in its own run
+        tracemalloc.start()
+        scan(file_name, scanner, reader_class)
+        measurement['peak_memory_mb'] = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 3)
+        tracemalloc.stop()
+    return measurement
+
+
+def run(sizes, corpora, engines, readers, repeat=3, memory=True):
+    results = []
+    directory = tempfile.mkdtemp()
+    for corpus in corpora:
+        for size in sizes:
+            file_name = os.path.join(directory, f'{corpus}-{size}.txt')
+            with open(file_name, 'w') as f:
+                f.write(generate(corpus, size))
+            for engine in engines:
+                for reader in readers:
+                    reader_class = engine_reader(engine, READERS[reader])
+                    measurement = measure(file_name, size, SCANNERS[engine], reader_class, repeat, memory)
+                    measurement.update(corpus=corpus, size=size, engine=engine, reader=reader)
+                    results.append(measurement)
+                    memory_used = f' {measurement["peak_memory_mb"]} MB peak' if memory else ''
+                    print(f'{corpus:12} {size:>11} {engine:10} {reader:7} {measurement["tokens_per_sec"]:>10} tok/s '
+                          f'{measurement["mb_per_sec"]:>8} MB/s{memory_used}')
+            os.remove(file_name)
+    os.rmdir(directory)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    this function will print the runs that are slower than the same run of the baseline and return how many there are
+    """
+    old = {(r['corpus'], r['size'], r['engine'], r['reader']): r for r in baseline['results']}
+    regressions = 0
+    for result in results:
+        before = old.get((result['corpus'], result['size'], result['engine'], result['reader']))
+        if not before:
+            continue
+        ratio = result['tokens_per_sec'] / before['tokens_per_sec']
+        if ratio < 1 - threshold:
+            regressions += 1
+            print(f'regression: {result["corpus"]} {result["size"]} {result["engine"]} {result["reader"]} '
+                  f'{before["tokens_per_sec"]} -> {result["tokens_per_sec"]} tok/s ({ratio:.2f}x)')
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description='benchmark the scanner engines on generated sources')
+    arg_parser.add_argument('--sizes', default='1KB,100KB,1MB', help='comma separated sizes, e.g. 1KB,10MB,100MB')
+    arg_parser.add_argument('--corpora', default=','.join(CORPORA), help='comma separated corpora')
+    arg_parser.add_argument('--engines', default=','.join(SCANNERS), help='comma separated scanner engines')
+    arg_parser.add_argument('--readers', default='file', help='comma separated readers')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the fastest one is kept')
+    arg_parser.add_argument('--no-memory', action='store_true', help='skip the peak memory runs')
+    arg_parser.add_argument('--output', default='scanner_benchmark.json', help='where the results are saved')
+    arg_parser.add_argument('--baseline', help='results of an earlier run to compare against')
+    arg_parser.add_argument('--threshold', type=float, default=0.1, help='slowdown that counts as a regression')
+    args = arg_parser.parse_args(argv)
+
+    results = run([parse_size(size) for size in args.sizes.split(',')], args.corpora.split(','),
+                  args.engines.split(','), args.readers.split(','), args.repeat, not args.no_memory)
+    with open(args.output, 'w') as f:
+        json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'results': results}, f,
+                  indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            if compare(results, json.load(f), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
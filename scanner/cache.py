@@ -0,0 +1,284 @@
+import hashlib
+import io
+import os
+import struct
+import tempfile
+import time
+import zlib
+from array import array
+
+from scanner.const import *
+from scanner.dfa import get_next_token as scan_token
+from scanner.io import *
+from scanner.terminals import END_TERMINAL, GRAMMAR_FILE
+from scanner.tokens import Token, TokenBuffer, InternTable
+
+MAGIC = b'TOKC2'  # changed with the layout of an entry
+HEADER = struct.Struct('<5siiii')  # magic, and line, column, start, end of the END token
+# the columns after the header are zlib compressed, level 1 is about 5 times smaller and still fast
+COMPRESSION_LEVEL = 1
+MAX_CACHE_SIZE = 64 << 20
+EVICT_TO = 0.75  # part of max_size left after an evict
+SIZE_FILE = 'size'  # running estimate of the size of the entries
+STALE_TEMPORARY_AGE = 3600  # seconds after which a temporary file of a store is deleted by evict
+SCANNER_FILES = ['const.py', 'dfa.py', 'io.py', 'tokens.py', 'regex_scanner.py', 'vectorized.py', 'terminals.py',
+                 'cache.py']
+
+
+def scanner_version(grammar_file=GRAMMAR_FILE):
+    """
+    this function will return a hash of the scanner sources and of the grammar, so cached tokens of an older scanner
+    or with the terminal ids of an older grammar are not used
+    """
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for file_name in [os.path.join(directory, name) for name in SCANNER_FILES] + [grammar_file]:
+        with open(file_name, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+SCANNER_VERSION = scanner_version()
+
+
+def write_array(f, values):
+    f.write(struct.pack('<i', len(values)))
+    f.write(values.tobytes())
+
+
+def read_array(data, position):
+    count, = struct.unpack_from('<i', data, position)
+    position += 4
+    values = array('i')
+    values.frombytes(data[position:position + 4 * count])
+    return values, position + 4 * count
+
+
+def write_strings(f, strings):
+    encoded = [string.encode() for string in strings]
+    write_array(f, array('i', map(len, encoded)))
+    f.write(b''.join(encoded))
+
+
+def read_strings(data, position):
+    lengths, position = read_array(data, position)
+    strings = []
+    for length in lengths:
+        strings.append(data[position:position + length].decode())
+        position += length
+    return strings, position
+
+
+class TokenCache:
+    """
+    scanner results on disk keyed by a hash of the source and the scanner, the least recently used ones are deleted
+    once the cache grows past max_size bytes
+    """
+
+    def __init__(self, directory, max_size=MAX_CACHE_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source, scanner):
+        digest = hashlib.sha256()
+        digest.update(SCANNER_VERSION.encode())
+        digest.update(f'{scanner.__module__}.{scanner.__qualname__}\0'.encode())
+        digest.update(source)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.tok')
+
+    def load(self, key):
+        """
+        this function will return (ScannerResult, END token) of a cached scan or None. a damaged entry, like one a
+        crashed process left behind, is deleted and counts as a miss.
+        """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            os.utime(path)  # the modification time is the last use for eviction
+        except OSError:
+            return None
+        try:
+            return self.read_entry(data)
+        except (zlib.error, struct.error, ValueError, UnicodeDecodeError, IndexError):
+            self.remove(path)
+            return None
+
+    def read_entry(self, data):
+        magic, line, column, start, end = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('not a token cache entry')
+        end_token = Token(line, start, end, column)
+        end_token.type = TokenType.END
+        end_token.content = '$'
+        end_token.terminal = END_TERMINAL
+
+        data = zlib.decompress(data[HEADER.size:])
+        result = ScannerResult()
+        position = 0
+        tokens = result.tokens = TokenBuffer()
+        tokens.types, position = read_array(data, position)
+        tokens.terminals, position = read_array(data, position)
+        tokens.lexemes, position = read_array(data, position)
+        tokens.lines, position = read_array(data, position)
+        tokens.columns, position = read_array(data, position)
+        tokens.starts, position = read_array(data, position)
+        tokens.ends, position = read_array(data, position)
+        lexemes, position = read_strings(data, position)
+        tokens.lexeme_table = InternTable(lexemes)
+
+        lines, position = read_array(data, position)
+        columns, position = read_array(data, position)
+        starts, position = read_array(data, position)
+        ends, position = read_array(data, position)
+        contents, position = read_strings(data, position)
+        messages, position = read_strings(data, position)
+        for i in range(len(lines)):
+            error = Token(lines[i], starts[i], ends[i], columns[i])
+            error.type = TokenType.ERROR
+            error.content = contents[i]
+            error.error = messages[i]
+            result.add(result.lexical_errors, error)
+
+        symbols, position = read_strings(data, position)
+        result.symbol_table = InternTable(symbols)
+        if position != len(data) or len({len(tokens.types), len(tokens.terminals), len(tokens.lexemes),
+                                          len(tokens.lines), len(tokens.columns), len(tokens.starts),
+                                          len(tokens.ends)}) != 1:
+            raise ValueError('damaged token cache entry')
+        return result, end_token
+
+    def store(self, key, result, end_token):
+        """
+        this function will write a finished scan into the cache
+        """
+        errors = [error for line_errors in result.lexical_errors for error in line_errors]
+        tokens = result.tokens
+        f = io.BytesIO()
+        for values in (tokens.types, tokens.terminals, tokens.lexemes, tokens.lines, tokens.columns, tokens.starts,
+                       tokens.ends):
+            write_array(f, values)
+        write_strings(f, tokens.lexeme_table)
+        for field in ('line', 'column', 'start', 'end'):
+            write_array(f, array('i', (getattr(error, field) for error in errors)))
+        write_strings(f, [error.content for error in errors])
+        write_strings(f, [error.error for error in errors])
+        write_strings(f, result.symbol_table)
+        data = HEADER.pack(MAGIC, end_token.line, end_token.column, end_token.start, end_token.end) + \
+            zlib.compress(f.getvalue(), COMPRESSION_LEVEL)
+        # every writer has its own temporary file, so processes that store the same source don't mix their writes
+        self.write_file(self.path(key), data)
+        total = self.add_size(len(data))
+        if total is None or total > self.max_size:
+            self.evict()
+
+    def write_file(self, path, data):
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as out:
+                out.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            self.remove(temporary)
+            raise
+
+    def remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:  # another process deleted it first
+            pass
+
+    def add_size(self, size):
+        """
+        this function will add size bytes to the running estimate of the cache size and return it, or None if there
+        is no estimate yet. the estimate is shared by the processes through a file, updates that race are lost, so
+        it can be lower than the real size until the next evict counts again.
+        """
+        path = os.path.join(self.directory, SIZE_FILE)
+        try:
+            with open(path) as f:
+                total = int(f.read()) + size
+        except (OSError, ValueError):
+            return None
+        self.write_file(path, str(total).encode())
+        return total
+
+    def evict(self):
+        """
+        this function will delete the least recently used entries until the cache is down to EVICT_TO of max_size,
+        so the directory is not listed again on the next store
+        """
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if name.endswith('.tok') or name.endswith('.tmp'):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:  # evicted by another process
+                    continue
+                if name.endswith('.tok'):
+                    entries.append((stat.st_mtime, stat.st_size, name))
+                elif now - stat.st_mtime > STALE_TEMPORARY_AGE:  # left behind by a process that crashed
+                    self.remove(os.path.join(self.directory, name))
+        total = sum(entry[1] for entry in entries)
+        if total > self.max_size:
+            for _, size, name in sorted(entries):
+                if total <= self.max_size * EVICT_TO:
+                    break
+                self.remove(os.path.join(self.directory, name))
+                total -= size
+        self.write_file(os.path.join(self.directory, SIZE_FILE), str(total).encode())
+
+
+class CachedReader:
+    """
+    a reader that replays the cached tokens of a file, on a miss the file is scanned by the given reader and scanner
+    and the result is cached once the scanner reaches END
+    """
+
+    def __init__(self, file_name: str, cache: TokenCache, reader_class=Reader, scanner=scan_token):
+        with open(file_name, 'rb') as f:
+            self.key = cache.key(f.read(), scanner)
+        self.cache = cache
+        self.cached = cache.load(self.key)
+        self.position = 0
+        if self.cached is None:
+            self.reader = reader_class(file_name)
+            self.scanner = scanner
+
+    def replay(self, result: ScannerResult):
+        cached, end_token = self.cached
+        if self.position == 0:  # the whole scan is known, the parser sees the same result as after scanning it
+            result.tokens = cached.tokens
+            result.lexical_errors = cached.lexical_errors
+            result.symbol_table = cached.symbol_table
+        tokens = cached.tokens
+        if self.position == len(tokens):
+            return end_token
+        view = tokens[self.position]
+        self.position += 1
+        token = Token(view.line, view.start, view.end, view.column)
+        token.type = view.type
+        token.content = view.content
+        token.terminal = view.terminal
+        token.index = view.index
+        if token.type == TokenType.ID:
+            token.symbol_id = cached.symbol_table.ids[token.content]
+        return token
+
+
+def get_next_token(reader: CachedReader, result: ScannerResult):
+    """
+    drop-in replacement for dfa.get_next_token on a CachedReader
+    """
+    if reader.cached is not None:
+        return reader.replay(result)
+    token = reader.scanner(reader.reader, result)
+    if token.type == TokenType.END and reader.position == 0:
+        reader.cache.store(reader.key, result, token)
+        reader.position = 1  # stored once
+    return token
@@ -9,6 +9,34 @@ class TokenType(Enum):
     NUM, ID, KEYWORD, SYMBOL, COMMENT, UNKNOWN, ERROR, END = range(8)
 
 
-class State(Enum):
-    START, NUM, ID, SYMBOL, ONE_LINE_COMMENT, MULTI_LINE_COMMENT, MULTI_LINE_COMMENT_END, UNDECIDED_COMMENT, END, ERROR = range(
-        10)
+class State:
+    """
+    states of the scanner dfa. these are plain ints so they can index the transition table directly.
+    """
+    START, NUM, ID, EQUAL, EQUAL_EQUAL, STAR, UNDECIDED_COMMENT, ONE_LINE_COMMENT, MULTI_LINE_COMMENT, \
+        MULTI_LINE_COMMENT_END = range(10)
+
+
+class CharClass:
+    """
+    every input character is mapped to one of these classes before indexing the transition table.
+    """
+    LETTER, DIGIT, SYMBOL, EQUAL, STAR, SLASH, NEWLINE, WHITESPACE, ALNUM, INVALID, EOF = range(11)
+
+
+class Move:
+    """
+    what happens to the current character when the dfa reaches a final decision.
+    TAKE: character is part of the token, DROP: character is consumed but not part of the token (whitespace),
+    BACK: character is left for the next token, AT_EOF: there was no character left.
+    """
+    TAKE, DROP, BACK, AT_EOF = range(4)
+
+
+class Action:
+    """
+    what the scanner does with a finished token.
+    ID and TOKEN are added to the tokens (IDs also go to the symbol table), ERROR is added to the lexical errors and
+    SKIP (comments and whitespace) is dropped.
+    """
+    ID, TOKEN, ERROR, SKIP = range(4)
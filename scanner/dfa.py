@@ -1,165 +1,288 @@
 from scanner.const import *
 from scanner.io import *
+from scanner.terminals import END_TERMINAL, ID_TERMINAL, KEYWORD_TERMINALS, NOT_A_TERMINAL, NUM_TERMINAL, \
+    SYMBOL_TERMINALS
+from scanner.tokens import Token
 
 
-class Token:
+def is_accepted_character(c):
+    return c.isalnum() or c in SYMBOLS or c in WHITESPACE or c == '/'
 
-    def __init__(self, line):
-        self.type = TokenType.UNKNOWN
-        self.content = ''
-        self.error = ''
-        self.line = line
 
-    def __repr__(self):
-        """
-        this function will the lexeme notation of  a token
-        """
-        if self.type == TokenType.END:
-            return '$'
-        elif self.type != TokenType.ERROR:
-            return f'({self.type.name}, {self.content})'
-        else:
-            if self.error == 'Unclosed comment' and len(self.error) > 7:
-                return f'({self.content.strip()[0:7]}..., {self.error})'
-            return f'({self.content.strip()}, {self.error})'
-
-    def get_terminal_form(self):
-        """
-        this function will return the grammar notation of a token content
-        """
-        if self.type == TokenType.ID or self.type == TokenType.NUM:
-            return self.type.name
+def classify_character(c):
+    """
+    this function will return the CharClass of a single character
+    """
+    if c == '\n':
+        return CharClass.NEWLINE
+    elif c in WHITESPACE:
+        return CharClass.WHITESPACE
+    elif c == '=':
+        return CharClass.EQUAL
+    elif c == '*':
+        return CharClass.STAR
+    elif c == '/':
+        return CharClass.SLASH
+    elif c in SYMBOLS:
+        return CharClass.SYMBOL
+    elif c.isalpha():
+        return CharClass.LETTER
+    elif c.isdigit():
+        return CharClass.DIGIT
+    elif c.isalnum():  # e.g. '½', part of an ID but not a letter or digit
+        return CharClass.ALNUM
+    return CharClass.INVALID
+
+
+class CharClassTable(dict):
+    """
+    character -> CharClass. ascii is filled up front, other characters are classified on first use.
+    """
+
+    def __init__(self):
+        super().__init__((chr(i), classify_character(chr(i))) for i in range(128))
+
+    def __missing__(self, c):
+        self[c] = classify_character(c)
+        return self[c]
+
+
+# entries of the transition table smaller than FINAL are the next state (the character is part of the token),
+# the rest point into OUTCOMES as (Move, TokenType, error, Action, terminal id). the terminal id of keywords and
+# symbols depends on the lexeme, it is None for them
+FINAL = 16
+OUTCOMES = []
+
+
+def build_transition_table():
+    outcomes = {}
+
+    def final(move, token_type, error=''):
+        if token_type == TokenType.ID:
+            action = Action.ID
+        elif token_type == TokenType.ERROR:
+            action = Action.ERROR
+        elif token_type in [TokenType.UNKNOWN, TokenType.COMMENT]:
+            action = Action.SKIP
         else:
-            return self.content
+            action = Action.TOKEN
+        terminal = {TokenType.ID: ID_TERMINAL, TokenType.NUM: NUM_TERMINAL}.get(token_type)
+        outcome = (move, token_type, error, action, terminal)
+        if outcome not in outcomes:
+            outcomes[outcome] = FINAL + len(OUTCOMES)
+            OUTCOMES.append(outcome)
+        return outcomes[outcome]
 
+    invalid_input = final(Move.TAKE, TokenType.ERROR, 'Invalid input')
+    table = []
+    for state in range(State.MULTI_LINE_COMMENT_END + 1):
+        row = [0] * (CharClass.EOF + 1)
+        for char_class in range(CharClass.EOF + 1):
+            row[char_class] = invalid_input
+        table.append(row)
 
-def is_accepted_character(c):
-    return c.isalnum() or c in SYMBOLS or c in WHITESPACE or c == '/'
+    row = table[State.START]
+    row[CharClass.LETTER] = State.ID
+    row[CharClass.DIGIT] = State.NUM
+    row[CharClass.SYMBOL] = final(Move.TAKE, TokenType.SYMBOL)
+    row[CharClass.EQUAL] = State.EQUAL  # symbols that need lookahead
+    row[CharClass.STAR] = State.STAR
+    row[CharClass.SLASH] = State.UNDECIDED_COMMENT
+    row[CharClass.NEWLINE] = row[CharClass.WHITESPACE] = final(Move.DROP, TokenType.UNKNOWN)
+    row[CharClass.EOF] = final(Move.AT_EOF, TokenType.UNKNOWN)
 
+    # ID and NUM end on any accepted character, the whitespace after them is consumed
+    for state, token_type in ((State.ID, TokenType.ID), (State.NUM, TokenType.NUM)):
+        row = table[state]
+        for char_class in (CharClass.SYMBOL, CharClass.EQUAL, CharClass.STAR, CharClass.SLASH, CharClass.ALNUM):
+            row[char_class] = final(Move.BACK, token_type)
+        row[CharClass.NEWLINE] = row[CharClass.WHITESPACE] = final(Move.DROP, token_type)
+        row[CharClass.EOF] = final(Move.AT_EOF, token_type)
+    row = table[State.ID]
+    row[CharClass.LETTER] = row[CharClass.DIGIT] = row[CharClass.ALNUM] = State.ID
+    row = table[State.NUM]
+    row[CharClass.DIGIT] = State.NUM
+    row[CharClass.LETTER] = row[CharClass.INVALID] = final(Move.TAKE, TokenType.ERROR, 'Invalid number')
 
-def get_next_token(reader: Reader, result: ScannerResult):
-    state = State.START
-    token = Token(reader.line)
-
-    while state != State.END:
-        c = reader.get_next_character()
-
-        if (c in WHITESPACE and token.type != TokenType.COMMENT) or c == '':
-            if (
-                    state == State.ONE_LINE_COMMENT or state == State.MULTI_LINE_COMMENT or state == State.MULTI_LINE_COMMENT_END) and c == '' and state != State.ONE_LINE_COMMENT:
-                token.type = TokenType.ERROR
-                token.error = 'Unclosed comment'
-            if state == State.UNDECIDED_COMMENT:
-                token.type = TokenType.ERROR
-                token.error = 'Invalid input'
-            state = State.END
-            continue
+    # '=', '==' and '*' end on any accepted character, '==' is only decided after seeing the next character
+    for state in (State.EQUAL, State.EQUAL_EQUAL, State.STAR):
+        row = table[state]
+        for char_class in (CharClass.LETTER, CharClass.DIGIT, CharClass.SYMBOL, CharClass.EQUAL, CharClass.STAR,
+                           CharClass.SLASH, CharClass.ALNUM):
+            row[char_class] = final(Move.BACK, TokenType.SYMBOL)
+        row[CharClass.NEWLINE] = row[CharClass.WHITESPACE] = final(Move.DROP, TokenType.SYMBOL)
+        row[CharClass.EOF] = final(Move.AT_EOF, TokenType.SYMBOL)
+    table[State.EQUAL][CharClass.EQUAL] = State.EQUAL_EQUAL
+    table[State.STAR][CharClass.SLASH] = final(Move.TAKE, TokenType.ERROR, 'Unmatched comment')
 
-        token.content += c
-
-        if state == State.START:
-            if c.isalpha():
-                state = State.ID
-                token.type = TokenType.ID
-            elif c.isdigit():
-                state = State.NUM
-                token.type = TokenType.NUM
-            elif c in SYMBOLS:
-                state = State.SYMBOL if c == '=' or c == '*' else State.END  # symbols that need lookahead
-                token.type = TokenType.SYMBOL
-            elif c == '/':
-                state = State.UNDECIDED_COMMENT
-                token.type = TokenType.COMMENT
-            else:
-                token.type = TokenType.ERROR
-                token.error = 'Invalid input'
-                state = State.END
-
-        elif state == State.NUM:
-            if not c.isdigit():
-                if c.isalpha() or not is_accepted_character(c):
-                    state = State.END
-                    token.type = TokenType.ERROR
-                    token.error = 'Invalid number'
-                else:
-                    reader.revert_single_character()
-                    token.content = token.content[:-1]
-                    state = State.END
-
-        elif state == State.ID:
-            if not c.isalnum() and is_accepted_character(c):
-                reader.revert_single_character()
-                token.content = token.content[:-1]
-                state = State.END
-            elif not is_accepted_character(c):
-                token.type = TokenType.ERROR
-                token.error = 'Invalid input'
-                state = State.END
-
-        elif state == State.SYMBOL:
-            if token.content == '*/' or not is_accepted_character(c):
-                token.type = TokenType.ERROR
-                token.error = 'Invalid input'
-                state = State.END
-            elif not token.content == '==' and is_accepted_character(c):
-                reader.revert_single_character()
-                token.content = token.content[:-1]
-                state = State.END
-
-        elif state == State.UNDECIDED_COMMENT:
-            if c == '/':
-                state = State.ONE_LINE_COMMENT
-            elif c == '*':
-                state = State.MULTI_LINE_COMMENT
-            else:
-                token.type = TokenType.ERROR
-                token.error = 'Invalid input'
-                if is_accepted_character(c):  # if the character after / is an invalid character we should output it
-                    # as an error
-                    reader.revert_single_character()
-                    token.content = token.content[:-1]
-                state = State.END
+    row = table[State.UNDECIDED_COMMENT]
+    for char_class in range(CharClass.EOF):
+        row[char_class] = final(Move.BACK, TokenType.ERROR, 'Invalid input')
+    row[CharClass.SLASH] = State.ONE_LINE_COMMENT
+    row[CharClass.STAR] = State.MULTI_LINE_COMMENT
+    row[CharClass.INVALID] = invalid_input  # the invalid character after / is a part of the error
+    row[CharClass.EOF] = final(Move.AT_EOF, TokenType.ERROR, 'Invalid input')
 
+    row = table[State.ONE_LINE_COMMENT]
+    for char_class in range(CharClass.EOF):
+        row[char_class] = State.ONE_LINE_COMMENT
+    row[CharClass.NEWLINE] = final(Move.TAKE, TokenType.COMMENT)
+    row[CharClass.EOF] = final(Move.AT_EOF, TokenType.COMMENT)
 
-        elif state == State.ONE_LINE_COMMENT:
-            if c == '\n':
-                state = State.END
+    for state in (State.MULTI_LINE_COMMENT, State.MULTI_LINE_COMMENT_END):
+        row = table[state]
+        for char_class in range(CharClass.EOF):
+            row[char_class] = State.MULTI_LINE_COMMENT
+        row[CharClass.STAR] = State.MULTI_LINE_COMMENT_END
+        row[CharClass.EOF] = final(Move.AT_EOF, TokenType.ERROR, 'Unclosed comment')
+    table[State.MULTI_LINE_COMMENT_END][CharClass.SLASH] = final(Move.TAKE, TokenType.COMMENT)
 
-        elif state == State.MULTI_LINE_COMMENT:
-            if c == '*':
-                state = State.MULTI_LINE_COMMENT_END
+    return table
 
 
-        elif state == State.MULTI_LINE_COMMENT_END:
-            if c == '/':
-                state = State.END
-            elif c != '*':
-                state = State.MULTI_LINE_COMMENT
+COMMENT_STATES = [State.ONE_LINE_COMMENT, State.MULTI_LINE_COMMENT, State.MULTI_LINE_COMMENT_END]
 
-    if token.type == TokenType.ID:
-        if token.content in KEYWORDS:
-            token.type = TokenType.KEYWORD
 
-    if not token.type in [TokenType.ERROR, TokenType.UNKNOWN, TokenType.COMMENT]:
-        result.add(result.tokens, token)
-    elif token.type == TokenType.ERROR:
-        if token.content == '*/':
-            token.error = 'Unmatched comment'
-        result.add(result.lexical_errors, token)
+def comment_head(text):
+    """
+    will cut a comment down to what its error notation needs: the first 7 characters and whether anything
+    other than whitespace comes after them
+    """
+    return text[:7] + text[7:].strip()[:1]
 
-    if token.type == TokenType.ID and not result.symbol_table.__contains__(token.content):
-        result.symbol_table.append(token.content)
 
-    if token.type == TokenType.COMMENT:
-        return get_next_token(reader, result)
+def decode(code, start, end, binary):
+    return code[start:end].decode() if binary else code[start:end]
+
+
+CHAR_CLASSES = CharClassTable()
+BYTE_CLASSES = [classify_character(chr(i)) for i in range(256)]
+TRANSITIONS = build_transition_table()
+
+
+def run_end(reader, code, position):
+    """
+    this function will return the end of the run position is in, from the window of runs the prepass of the reader
+    classified. a window is classified when the scan gets past the one before.
+    """
+    runs = reader.runs
+    if runs is None or not 0 <= position - reader.runs_start < len(runs):
+        runs = reader.runs = reader.prepass(code, position)
+        reader.runs_start = position
+    return runs[position - reader.runs_start]
+
+
+def get_next_token(reader: Reader, result: ScannerResult):
+    code = reader.code
+    end = len(code)
+    binary = reader.binary  # code is ascii bytes, lexemes are decoded when a token is emitted
+    char_classes = BYTE_CLASSES if binary else CHAR_CLASSES
+    table = TRANSITIONS
+    newline, comment_close = (b'\n', b'*/') if binary else ('\n', '*/')
+    prepass = reader.prepass  # identifier, number and whitespace runs are jumped over when it is set
+
+    while True:  # comments, whitespace and errors are skipped until a token is found
+        start = index = reader.index
+        token_start = reader.offset + start
+        position = None  # line and column of the token, only looked up when it is emitted
+        head = ''  # start of a comment whose body was dropped while reading more of the file
+        row = table[State.START]
+        while True:
+            if index < end:
+                entry = row[char_classes[code[index]]]
+            else:
+                if any(row is table[state] for state in COMMENT_STATES):
+                    # only the first characters of a comment are needed to report it, the rest is dropped
+                    if position is None:
+                        position = reader.locate(token_start)
+                    head = comment_head(head + decode(code, start, index, binary))
+                    start = index
+                reader.index = start
+                dropped = reader.read_chunk(start)
+                if dropped is None:
+                    entry = row[CharClass.EOF]
+                else:
+                    code = reader.code
+                    end = len(code)
+                    start -= dropped
+                    index -= dropped
+                    continue
+            if entry < FINAL:
+                row = table[entry]
+                index += 1
+                if entry <= State.ID:
+                    if prepass:  # the rest of the number or identifier is taken at once
+                        index = run_end(reader, code, index - 1)
+                # comment bodies are jumped over with a bulk search instead of one character at a time
+                elif entry == State.ONE_LINE_COMMENT:
+                    index = code.find(newline, index, end)
+                    if index == -1:
+                        index = end
+                elif entry == State.MULTI_LINE_COMMENT:
+                    close = code.find(comment_close, index, end)
+                    if close == -1:  # a '*' at the end of the buffer may still be closed by the next chunk
+                        index = max(index, end - 1)
+                    else:
+                        index = close + 1
+                        row = table[State.MULTI_LINE_COMMENT_END]
+                continue
+            break
+
+        move, token_type, error, action, terminal = OUTCOMES[entry - FINAL]
+        content_end = index
+        if move == Move.TAKE:
+            index += 1
+            content_end = index
+        elif move == Move.DROP:
+            index += 1
+            if prepass:  # the rest of the whitespace is skipped as well
+                index = run_end(reader, code, index - 1)
+        reader.index = index
+
+        if action == Action.SKIP:  # comments and whitespace
+            if move != Move.AT_EOF or token_type == TokenType.COMMENT:
+                continue
+
+        line, column = position or reader.locate(token_start)
+        token = Token(line, token_start, reader.offset + content_end, column)
+        token.type = token_type
+        token.error = error
+        content = code[start:content_end]
+        token.content = head + (content.decode() if binary else content)
+
+        if action == Action.ERROR:
+            result.add(result.lexical_errors, token)
+            continue
+
+        # the terminal id comes from what the table decided, only keywords and symbols need their lexeme for it
+        if action == Action.ID:
+            keyword = KEYWORD_TERMINALS.get(token.content)
+            if keyword is None:
+                token.symbol_id = result.symbol_table.intern(token.content)
+            else:
+                token.type = TokenType.KEYWORD
+                terminal = keyword
+        elif terminal is None:
+            terminal = SYMBOL_TERMINALS.get(token.content, NOT_A_TERMINAL)
+
+        # a token ended by EOF is still reported, but as END like the parser gets it
+        if move == Move.AT_EOF:
+            token.content = '$'
+            token.type = TokenType.END
+            terminal = END_TERMINAL
+        token.terminal = terminal
+        if action != Action.SKIP:
+            result.tokens.append(token)
 
-    if token.type == TokenType.ERROR:
-        return get_next_token(reader, result)
+        return token
 
-    if c == '':
-        token.content = '$'
-        token.type = TokenType.END
-    elif token.type == TokenType.UNKNOWN:  # current token is new line
-        return get_next_token(reader, result)
 
-    return token
+def iter_tokens(reader: Reader, result: ScannerResult):
+    """
+    this generator will lazily yield the tokens of the reader, the last one is END
+    """
+    while True:
+        token = get_next_token(reader, result)
+        yield token
+        if token.type == TokenType.END:
+            return
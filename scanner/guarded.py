@@ -0,0 +1,140 @@
+import re
+
+from scanner.const import *
+from scanner.dfa import get_next_token as scan_token
+from scanner.io import *
+from scanner.terminals import END_TERMINAL
+from scanner.tokens import Token
+
+MAX_ERRORS_PER_LINE = 10
+MAX_ERRORS = 100
+ERROR_BUDGET = 10000
+MAX_ERROR_LENGTH = 64  # longest content kept for a run of invalid characters
+# characters the dfa classifies as CharClass.INVALID, \w is the characters of str.isalnum and '_'
+INVALID_CHARACTERS = r'(?:[^\w \n\r\t\v\f;:,\[\](){}+\-<=*/]|_)+'
+INVALID_RUN = re.compile(INVALID_CHARACTERS)
+INVALID_RUN_BYTES = re.compile(INVALID_CHARACTERS.encode())  # binary readers only hold ascii
+
+
+class ScanAborted(Exception):
+    pass
+
+
+def error_record(line, content, error):
+    token = Token(line)
+    token.type = TokenType.ERROR
+    token.content = content
+    token.error = error
+    return token
+
+
+class GuardedResult(ScannerResult):
+    """
+    a ScannerResult with bounded error output for junk input. runs of invalid characters become one error, only
+    max_errors_per_line errors of a line and max_errors of the file are kept and the rest is counted in a summary.
+    after error_budget errors the scan is aborted, a run of invalid characters counts once.
+    """
+
+    def __init__(self, max_errors_per_line=MAX_ERRORS_PER_LINE, max_errors=MAX_ERRORS, error_budget=ERROR_BUDGET):
+        super().__init__()
+        self.max_errors_per_line = max_errors_per_line
+        self.max_errors = max_errors
+        self.error_budget = error_budget
+        self.error_count = 0  # every error the scanner found after coalescing, kept or not
+        self.kept_errors = 0
+        self.line_suppressed = 0
+        self.file_suppressed = 0
+        self.last_line = None
+        self.last_error = None  # the error before, whether it was kept or not
+        self.aborted = False
+        self.finished = False
+
+    def add(self, l, token):
+        if l is not self.lexical_errors:
+            return super().add(l, token)
+        last = self.last_error
+        if last is not None and last.error == token.error == 'Invalid input' and last.end == token.start:
+            if len(last.content) < MAX_ERROR_LENGTH:
+                last.content = (last.content + token.content)[:MAX_ERROR_LENGTH]
+            last.end = token.end
+            return
+        self.last_error = token
+        self.error_count += 1
+        if self.error_count > self.error_budget:
+            raise ScanAborted()
+        if token.line != self.last_line:
+            self.summarize_line()
+            self.last_line = token.line
+        if self.kept_errors >= self.max_errors:
+            self.file_suppressed += 1
+        elif l and l[-1][0].line == token.line and len(l[-1]) >= self.max_errors_per_line:
+            self.line_suppressed += 1
+        else:
+            self.kept_errors += 1
+            super().add(l, token)
+
+    def summarize_line(self):
+        if self.line_suppressed:
+            super().add(self.lexical_errors, error_record(self.last_line, f'{self.line_suppressed} more',
+                                                          'Too many errors on this line'))
+            self.line_suppressed = 0
+
+    def finish(self):
+        """
+        this function will add the summary records once the scan is over
+        """
+        if self.finished:
+            return
+        self.finished = True
+        self.summarize_line()
+        if self.file_suppressed:
+            super().add(self.lexical_errors, error_record(self.last_line, f'{self.file_suppressed} more',
+                                                          'Too many errors'))
+        if self.aborted:
+            super().add(self.lexical_errors, error_record(self.last_line, f'after {self.error_budget} errors',
+                                                          'Scan aborted'))
+
+
+def skip_invalid_run(reader: Reader, result: GuardedResult):
+    """
+    will report the run of invalid characters at the position of the reader as one error and move the reader after
+    it, so the scanner doesn't go through them one character and one Token at a time
+    """
+    match = (INVALID_RUN_BYTES if reader.binary else INVALID_RUN).match(reader.code, reader.index)
+    if match is None:
+        return
+    start = reader.offset + match.start()
+    line, column = reader.locate(start)
+    token = Token(line, start, reader.offset + match.end(), column)
+    token.type = TokenType.ERROR
+    token.error = 'Invalid input'
+    content = match.group()[:MAX_ERROR_LENGTH]
+    token.content = content.decode() if reader.binary else content
+    reader.index = match.end()
+    reader.bulk_tokens = None  # the token generator of the regex-bulk engine goes on from the new position
+    result.add(result.lexical_errors, token)
+
+
+def get_next_token(reader: Reader, result: GuardedResult, scanner=scan_token):
+    """
+    drop-in replacement for dfa.get_next_token on a GuardedResult, it returns END once the error budget is used up
+    """
+    if not result.aborted:
+        try:
+            if isinstance(reader, Reader):  # a CachedReader replays a scan, it has no buffer
+                skip_invalid_run(reader, result)
+            token = scanner(reader, result)
+        except ScanAborted:
+            result.aborted = True
+        else:
+            if token.type == TokenType.END:
+                result.finish()
+            return token
+    result.finish()
+    offset = reader.offset + reader.index
+    line, column = reader.locate(offset)
+    token = Token(line, offset, offset, column)
+    token.type = TokenType.END
+    token.content = '$'
+    token.terminal = END_TERMINAL
+    return token
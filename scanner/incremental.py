@@ -0,0 +1,182 @@
+from array import array
+from bisect import bisect_left
+from itertools import compress
+
+from scanner.const import *
+from scanner.dfa import get_next_token
+from scanner.io import *
+from scanner.tokens import Token
+
+KEYWORD_COUNT = len(ScannerResult().symbol_table)  # the keywords every symbol table starts with
+
+
+def apply_edits(code, edits):
+    """
+    this function will apply the edits to code one after another, an edit is (offset, removed length, inserted text)
+    """
+    for offset, removed, inserted in edits:
+        code = code[:offset] + inserted + code[offset + removed:]
+    return code
+
+
+def edit_region(edits):
+    """
+    this function will return (start, old end, new end) of the smallest region that covers all the edits.
+    code[start:old end] of the old code became code[start:new end] of the new one.
+    """
+    start = old_end = new_end = None
+    for offset, removed, inserted in edits:
+        if start is None:
+            start, old_end, new_end = offset, offset + removed, offset + len(inserted)
+            continue
+        if offset + removed > new_end:  # the edit reaches past the region, the rest of it is unchanged old code
+            old_end += offset + removed - new_end
+            new_end = offset + removed
+        start = min(start, offset)
+        new_end += len(inserted) - removed
+    return start, old_end, new_end
+
+
+def shift_error(token, reader, shift, line_shift):
+    """
+    will copy an error of the old code to its place in the new code
+    """
+    line, column = reader.locate(token.start + shift)
+    moved = Token(token.line + line_shift, token.start + shift, token.end + shift, column)
+    moved.type = token.type
+    moved.content = token.content
+    moved.error = token.error
+    return moved
+
+
+def relex(code, result, edits, scanner=get_next_token):
+    """
+    this function will return the new code and its ScannerResult after the edits, given the old code and its result.
+    only the tokens from the last one before the edits up to where the new tokens line up with the old ones again
+    are scanned, the rest is copied from the old result with their offsets and lines moved.
+    """
+    new_code = apply_edits(code, edits)
+    if not edits:
+        return new_code, result
+    start, old_end, new_end = edit_region(edits)
+    shift = new_end - old_end
+    line_shift = new_code.count('\n', start, new_end) - code.count('\n', start, old_end)
+    tokens = result.tokens
+    ends = tokens.ends
+
+    # a token is kept if the character after it, which the scanner looked at to end it, is before the edits too
+    kept = bisect_left(ends, start)
+    restart = ends[kept - 1] if kept else 0
+    reader = TextReader(new_code)
+    reader.index = restart
+    scanned = ScannerResult()
+    synced = None  # index of the first old token after the new tokens line up with the old ones
+    while True:
+        token = scanner(reader, scanned)
+        if token.type == TokenType.END:
+            break
+        if token.end >= new_end:
+            i = bisect_left(ends, token.end - shift, kept)
+            if i < len(ends) and ends[i] == token.end - shift:
+                synced = i + 1
+                break
+
+    new_result = ScannerResult()
+    new_tokens = new_result.tokens
+    new_tokens.lexeme_table = tokens.lexeme_table  # shared, old ids stay valid as the table only grows
+    new_tokens.extend(tokens, 0, kept)
+    new_tokens.extend(scanned.tokens)
+    errors = [error for line_errors in result.lexical_errors for error in line_errors]
+    new_errors = [error for error in errors if error.end <= restart]
+    new_errors += [error for line_errors in scanned.lexical_errors for error in line_errors]
+    if synced is not None:
+        resume = ends[synced - 1]
+        first = len(new_tokens)
+        new_tokens.extend(tokens, synced, None, shift, line_shift)
+        # only the columns of the line the edits end on move
+        line = reader.locate(resume + shift)[0]
+        for i in range(first, len(new_tokens)):
+            if new_tokens.lines[i] != line:
+                break
+            new_tokens.columns[i] = reader.locate(new_tokens.starts[i])[1]
+        new_errors += [shift_error(error, reader, shift, line_shift) for error in errors if error.start >= resume]
+    for error in new_errors:
+        new_result.add(new_result.lexical_errors, error)
+
+    # the shared table also keeps the lexemes of the tokens that were replaced, like every prefix of a word that is
+    # typed. once it is twice the size it had after the last compaction the new tokens get a table of their own.
+    compact_size = tokens.compact_size or len(tokens.lexeme_table)
+    if len(new_tokens.lexeme_table) > 2 * compact_size:
+        new_tokens.compact()
+    else:
+        new_tokens.compact_size = compact_size
+
+    update_symbol_table(new_code, result, new_result, kept, scanned, synced)
+    return new_code, new_result
+
+
+def symbol_tokens(result):
+    """
+    this function will return the index of the first token of every symbol of the result, -1 for the keywords the
+    symbol table starts with. relex keeps them with its results, for other results they are found from the tokens.
+    """
+    if result.symbol_tokens is not None:
+        return result.symbol_tokens
+    tokens = result.tokens
+    lexeme_table = tokens.lexeme_table
+    firsts = {}
+    for index in compress(range(len(tokens)), map(TokenType.ID.value.__eq__, tokens.types)):
+        firsts.setdefault(lexeme_table[tokens.lexemes[index]], index)
+    # the only symbol without an ID token is an ID ended by EOF, its token is END
+    result.symbol_tokens = array('i', (firsts.get(lexeme, len(tokens) - 1) if symbol_id >= KEYWORD_COUNT
+                                       else -1 for symbol_id, lexeme in enumerate(result.symbol_table)))
+    return result.symbol_tokens
+
+
+def update_symbol_table(new_code, result, new_result, kept, scanned, synced):
+    """
+    will fill the symbol table of new_result in the order its IDs first show up, like a scan of the new code does.
+    the symbols that show up before the edits are copied, the rest come from the scanned tokens and from the old
+    symbols that show up after them.
+    """
+    old_symbols = result.symbol_table
+    old_firsts = symbol_tokens(result)
+    symbol_table = new_result.symbol_table
+    firsts = array('i', [-1] * len(symbol_table))
+    prefix = bisect_left(old_firsts, kept)
+    for symbol_id in range(len(symbol_table), prefix):
+        symbol_table.intern(old_symbols[symbol_id])
+        firsts.append(old_firsts[symbol_id])
+
+    scanned_tokens = scanned.tokens
+    for i in compress(range(len(scanned_tokens)), map(TokenType.ID.value.__eq__, scanned_tokens.types)):
+        lexeme = scanned_tokens.lexeme_table[scanned_tokens.lexemes[i]]
+        if lexeme not in symbol_table:
+            symbol_table.intern(lexeme)
+            firsts.append(kept + i)
+
+    new_tokens = new_result.tokens
+    if synced is not None:
+        tokens = result.tokens
+        move = len(new_tokens) - len(tokens)  # where the old tokens after synced are now
+        tail = bisect_left(old_firsts, synced, prefix)
+        symbols = [(old_firsts[symbol_id], old_symbols[symbol_id]) for symbol_id in range(tail, len(old_symbols))]
+        # a symbol whose first token was replaced might still show up after the edits
+        for symbol_id in range(prefix, tail):
+            lexeme_id = tokens.lexeme_table.ids.get(old_symbols[symbol_id])
+            if lexeme_id is not None:
+                try:
+                    symbols.append((tokens.lexemes.index(lexeme_id, synced), old_symbols[symbol_id]))
+                except ValueError:
+                    pass
+        for index, lexeme in sorted(symbols):
+            if lexeme not in symbol_table:
+                symbol_table.intern(lexeme)
+                firsts.append(index + move)
+
+    if len(new_tokens) and new_tokens.types[-1] == TokenType.END.value:  # an ID ended by EOF is reported as END
+        lexeme = new_code[new_tokens.starts[-1]:new_tokens.ends[-1]]
+        if lexeme[:1].isalpha() and lexeme not in KEYWORDS and lexeme not in symbol_table:
+            symbol_table.intern(lexeme)
+            firsts.append(len(new_tokens) - 1)
+    new_result.symbol_tokens = firsts
@@ -1,35 +1,181 @@
+import mmap
+import os
+import re
+from array import array
+from bisect import bisect_left
+
+from scanner.tokens import TokenBuffer, InternTable
+
+NEWLINE = re.compile('\n')
+NEWLINE_BYTES = re.compile(b'\n')
+WRITE_BUFFER_SIZE = 1 << 16
+
+
 class Reader:
+    binary = False  # code is a str
+    prepass = None  # function that classifies a window of the buffer for the dfa, see scanner.vectorized
+    runs = None  # its result for the current window
+    runs_start = 0  # position of the window in code
+    bulk_tokens = None  # the token generator of scanner.regex_scanner.get_next_token_bulk
+    line_start, line_end, line_number = 0, -1, 0  # the line locate found last, file offsets of its start and newline
 
     def __init__(self, file_name: str):
         f = open(file_name, "r")
         self.code = f.read()
         self.index = 0
+        self.offset = 0  # position of code[0] in the file
         f.close()
-        self.current_character = ''
-        self.line = 1
+        self.newlines = array('q')  # file offsets of the newlines in code, lines are looked up from them
+        self.dropped_lines = 0  # number of newlines that were dropped from the start of newlines
+        self.index_lines(0)
+
+    @property
+    def line(self):
+        return self.locate(self.offset + self.index)[0]
+
+    def index_lines(self, start):
+        """
+        will add the newlines of code[start:] to the line index
+        """
+        offset = self.offset
+        newline = NEWLINE_BYTES if self.binary else NEWLINE
+        self.newlines.extend(match.start() + offset for match in newline.finditer(self.code, start))
+
+    def locate(self, offset):
+        """
+        this function will return the line and the column of a file offset, both start from 1. the tokens of a line
+        come one after another, so the line found last is checked before searching the newlines.
+        """
+        if self.line_start <= offset <= self.line_end:
+            return self.line_number, offset - self.line_start + 1
+        newlines = self.newlines
+        i = bisect_left(newlines, offset)
+        line_start = newlines[i - 1] + 1 if i else 0
+        line = self.dropped_lines + i + 1
+        if i < len(newlines):  # the newline of the last line may not be read yet
+            self.line_start, self.line_end, self.line_number = line_start, newlines[i], line
+        return line, offset - line_start + 1
 
     def get_next_character(self):
         if len(self.code) <= self.index:
             return ''
         c = self.code[self.index]
         self.index += 1
-        self.current_character = c
-        if c == '\n':
-            self.line += 1
         return c
 
     def revert_single_character(self):
-        if self.current_character == '\n':
-            self.line -= 1
         self.index -= 1
 
+    def read_chunk(self, keep_from):
+        """
+        will load more of the file into code. the text before keep_from is dropped and index is moved back by the same
+        amount. returns the number of dropped characters or None at EOF.
+        """
+        return None  # the whole file is already in code
+
+
+class StreamReader(Reader):
+    """
+    a reader that only keeps the current token and the chunk after it in memory
+    """
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, file_name: str, chunk_size=CHUNK_SIZE):
+        self.file = open(file_name, "r")
+        self.chunk_size = chunk_size
+        self.code = ''
+        self.index = 0
+        self.offset = 0
+        self.newlines = array('q')
+        self.dropped_lines = 0
+
+    def get_next_character(self):
+        # one character before index is kept so revert_single_character works across chunks
+        if len(self.code) <= self.index and self.read_chunk(max(self.index - 1, 0)) is None:
+            return ''
+        return super().get_next_character()
+
+    def read_chunk(self, keep_from):
+        if not self.file:
+            return None
+        kept = self.code[keep_from:]
+        chunk = self.file.read(max(self.chunk_size, len(kept)))  # grow with long tokens so rescanning them is linear
+        if not chunk:
+            self.file.close()
+            self.file = None
+            return None
+        self.code = kept + chunk
+        self.runs = None
+        self.index -= keep_from
+        self.offset += keep_from
+        # newlines of the dropped text are only counted, the last one is kept for the columns of the next line
+        dropped = bisect_left(self.newlines, self.offset) - 1
+        if dropped > 0:
+            del self.newlines[:dropped]
+            self.dropped_lines += dropped
+        self.index_lines(len(kept))
+        return keep_from
+
+
+class MmapReader(Reader):
+    """
+    a reader that maps the file into memory so the scanner works on its ascii bytes without decoding them.
+    files the text mode reader would change (non-ascii characters, carriage returns) are read as a str instead.
+    """
+
+    def __init__(self, file_name: str):
+        with open(file_name, "rb") as f:
+            try:
+                code = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty files can't be mapped
+                code = b''
+        if re.search(rb'[\r\x80-\xff]', code):
+            code.close()
+            super().__init__(file_name)
+            return
+        self.binary = True
+        self.code = code
+        self.index = 0
+        self.offset = 0
+        self.newlines = array('q')
+        self.dropped_lines = 0
+        self.index_lines(0)
+
+    def get_next_character(self):
+        if not self.binary:
+            return super().get_next_character()
+        if len(self.code) <= self.index:
+            return ''
+        c = chr(self.code[self.index])
+        self.index += 1
+        return c
+
+
+class TextReader(Reader):
+    """
+    a reader over text that is already in memory, like a part of a file. offsets and lines are the ones of the whole
+    file the text starts in.
+    """
+
+    def __init__(self, code, offset=0, first_line=1):
+        self.code = code
+        self.index = 0
+        self.offset = offset
+        self.newlines = array('q')
+        self.dropped_lines = 0
+        if offset:  # parts start after a newline, it is kept like the last dropped one of a StreamReader
+            self.newlines.append(offset - 1)
+            self.dropped_lines = first_line - 2
+        self.index_lines(0)
+
 
 class ScannerResult:
 
     def __init__(self):
         self.lexical_errors = []
-        self.symbol_table = ['if', 'else', 'void', 'int', 'repeat', 'break', 'until', 'return']
-        self.tokens = []
+        self.symbol_table = InternTable(['if', 'else', 'void', 'int', 'repeat', 'break', 'until', 'return'])
+        self.tokens = TokenBuffer()
+        self.symbol_tokens = None  # index of the first token of every symbol, kept by scanner.incremental
         self.index = 0
 
     def add(self, l, token):
@@ -39,23 +185,76 @@ class ScannerResult:
             l.append([token])
 
     def write_into_file(self):
-        self.write(self.tokens, 'tokens.txt')
+        self.write(self.tokens.group_by_line(), 'tokens.txt')
         self.write(self.lexical_errors, 'lexical_errors.txt', empty_message='There is no lexical error.')
         self.write(self.symbol_table, 'symbol_table.txt', is_list=False)
 
     @classmethod
     def write(cls, output, file, empty_message="", is_list=True):
-        f = open(file, "w")
+        if is_list:
+            writer = LineWriter(file, empty_message)
+            for item in output:
+                for token in item:
+                    writer.append(token)
+            writer.close()
+            return
+        f = open(file, "w", buffering=WRITE_BUFFER_SIZE)
         if output:
-            if is_list:
-                for item in output:
-                    out = ''
-                    for token in item:
-                        out += f'{token.__repr__()} '
-                    f.writelines(f'{item[0].line}.\t{out}\n')
-            else:
-                for num, item in enumerate(output, 1):
-                    f.writelines(f'{num}.\t{item}\n')
+            f.writelines(f'{num}.\t{item}\n' for num, item in enumerate(output, 1))
         else:
             f.write(empty_message)
         f.close()
+
+
+class LineWriter:
+    """
+    writes tokens into a file grouped by their line, a line is written as soon as a token of a later line comes.
+    only the current line is kept in memory.
+    """
+
+    def __init__(self, file_name, empty_message=''):
+        self.file = open(file_name, "w", buffering=WRITE_BUFFER_SIZE)
+        self.empty_message = empty_message
+        self.line = None
+        self.parts = []
+        self.written = False
+
+    def append(self, token):
+        if token.line != self.line:
+            self.write_line()
+            self.line = token.line
+        self.parts.append(f'{token.__repr__()} ')
+
+    def write_line(self):
+        if self.parts:
+            self.file.write(f'{self.line}.\t{"".join(self.parts)}\n')
+            self.parts = []
+            self.written = True
+
+    def close(self):
+        self.write_line()
+        if not self.written:
+            self.file.write(self.empty_message)
+        self.file.close()
+
+
+class StreamingResult(ScannerResult):
+    """
+    a ScannerResult that writes tokens.txt and lexical_errors.txt while scanning instead of keeping the tokens and
+    errors of the whole file. write_into_file finishes the files and writes symbol_table.txt.
+    """
+
+    def __init__(self, directory='.'):
+        super().__init__()
+        self.directory = directory
+        self.tokens = LineWriter(os.path.join(directory, 'tokens.txt'))
+        self.lexical_errors = LineWriter(os.path.join(directory, 'lexical_errors.txt'),
+                                         empty_message='There is no lexical error.')
+
+    def add(self, l, token):
+        l.append(token)
+
+    def write_into_file(self):
+        self.tokens.close()
+        self.lexical_errors.close()
+        self.write(self.symbol_table, os.path.join(self.directory, 'symbol_table.txt'), is_list=False)
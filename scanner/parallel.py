@@ -0,0 +1,107 @@
+import os
+import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from scanner.const import *
+from scanner.dfa import get_next_token
+from scanner.io import *
+
+COMMENT_MARKS = re.compile(r'//|/\*|\*/')
+MIN_CHUNK_SIZE = 1 << 20  # smaller files are not worth starting processes for
+
+
+def comment_spans(code):
+    """
+    this function will return the start and end offsets of the multi-line comments of code. '/*' inside one-line
+    comments and unmatched '*/' are passed over like the scanner does.
+    """
+    spans = []
+    position = 0
+    while True:
+        match = COMMENT_MARKS.search(code, position)
+        if not match:
+            return spans
+        if match.group() == '//':
+            position = code.find('\n', match.end())
+            if position == -1:
+                return spans
+        elif match.group() == '/*':
+            close = code.find('*/', match.end())
+            if close == -1:
+                spans.append((match.start(), len(code)))
+                return spans
+            spans.append((match.start(), close + 2))
+            position = close + 2
+        else:
+            position = match.end()
+
+
+def find_split_points(code, parts):
+    """
+    this function will return up to parts - 1 offsets to split code at. every one is right after a newline that is
+    outside of any multi-line comment, so no token goes on over it.
+    """
+    spans = comment_spans(code)
+    starts = [span[0] for span in spans]
+    points = []
+    for part in range(1, parts):
+        position = max(len(code) * part // parts, points[-1] if points else 0)
+        while True:
+            newline = code.find('\n', position)
+            if newline == -1:
+                return points
+            i = bisect_right(starts, newline) - 1
+            if i >= 0 and newline < spans[i][1]:  # inside a comment, try after it
+                position = spans[i][1]
+                continue
+            break
+        if newline + 1 < len(code) and (not points or points[-1] < newline + 1):
+            points.append(newline + 1)
+    return points
+
+
+def scan_chunk(code, offset, first_line, scanner=get_next_token):
+    """
+    this function will scan a single chunk in a worker and return its ScannerResult
+    """
+    reader = TextReader(code, offset, first_line)
+    result = ScannerResult()
+    while scanner(reader, result).type != TokenType.END:
+        pass
+    return result
+
+
+def merge_results(parts):
+    """
+    this function will merge the results of consecutive chunks into the result of scanning them as one file
+    """
+    result = ScannerResult()
+    for part in parts:
+        result.tokens.extend(part.tokens)
+        for line_errors in part.lexical_errors:
+            for token in line_errors:
+                result.add(result.lexical_errors, token)
+        for lexeme in part.symbol_table:
+            result.symbol_table.intern(lexeme)
+    return result
+
+
+def scan_parallel(file_name, workers=None, scanner=get_next_token, min_chunk_size=MIN_CHUNK_SIZE):
+    """
+    this function will scan a whole file split into chunks on a process pool and return the same ScannerResult as
+    scanning it in one go. the tokens, lexical errors and symbol table are filled, the parser still scans on its own.
+    """
+    code = Reader(file_name).code
+    workers = workers or os.cpu_count() or 1
+    parts = min(workers, max(len(code) // min_chunk_size, 1))
+    bounds = [0] + find_split_points(code, parts) + [len(code)]
+    chunks = []
+    first_line = 1
+    for start, end in zip(bounds, bounds[1:]):
+        chunks.append((code[start:end], start, first_line))
+        first_line += code.count('\n', start, end)
+    if len(chunks) == 1:
+        return merge_results([scan_chunk(*chunks[0], scanner)])
+    with ProcessPoolExecutor(len(chunks)) as executor:
+        return merge_results(executor.map(scan_chunk, *zip(*chunks), [scanner] * len(chunks)))
@@ -0,0 +1,171 @@
+import re
+
+from scanner import dfa
+from scanner.const import *
+from scanner.io import *
+from scanner.terminals import END_TERMINAL, ID_TERMINAL, KEYWORD_TERMINALS, NOT_A_TERMINAL, NUM_TERMINAL, \
+    SYMBOL_TERMINALS
+from scanner.tokens import Token
+
+
+def compile_master(invalid):
+    return '|'.join([
+        rf'(?P<ID>[A-Za-z][A-Za-z0-9]*)(?P<ID_ERROR>{invalid})?',
+        rf'(?P<NUM>[0-9]+)(?P<NUM_ERROR>[A-Za-z]|{invalid})?',
+        r'(?P<SYMBOL>[;:,\[\](){}+\-<])',
+        r'(?P<UNMATCHED>\*/)',
+        rf'(?P<LOOKAHEAD>==?|\*)(?P<LOOKAHEAD_ERROR>{invalid})?',  # symbols that need lookahead
+        r'(?P<COMMENT>//[^\n]*\n?|/\*.*?\*/)',
+        r'(?P<UNCLOSED>/\*.*)',
+        rf'(?P<SLASH>/{invalid}?)',
+        r'(?P<WHITESPACE>[ \n\r\t\v\f]+)',
+        r'(?P<INVALID>.)',
+    ])
+
+
+# the master regex only knows ascii, tokens touching any other character are scanned by the dfa instead
+MASTER = re.compile(compile_master(r'[^A-Za-z0-9 \n\r\t\v\f;:,\[\](){}+\-<=*/\x80-\U0010ffff]'), re.DOTALL)
+# binary readers only hold ascii
+MASTER_BYTES = re.compile(compile_master(r'[^A-Za-z0-9 \n\r\t\v\f;:,\[\](){}+\-<=*/]').encode(), re.DOTALL)
+
+# group -> (TokenType, error, Action)
+GROUPS = {
+    'ID': (TokenType.ID, '', Action.ID),
+    'ID_ERROR': (TokenType.ERROR, 'Invalid input', Action.ERROR),
+    'NUM': (TokenType.NUM, '', Action.TOKEN),
+    'NUM_ERROR': (TokenType.ERROR, 'Invalid number', Action.ERROR),
+    'SYMBOL': (TokenType.SYMBOL, '', Action.TOKEN),
+    'UNMATCHED': (TokenType.ERROR, 'Unmatched comment', Action.ERROR),
+    'LOOKAHEAD': (TokenType.SYMBOL, '', Action.TOKEN),
+    'LOOKAHEAD_ERROR': (TokenType.ERROR, 'Invalid input', Action.ERROR),
+    'COMMENT': (TokenType.COMMENT, '', Action.SKIP),
+    'UNCLOSED': (TokenType.ERROR, 'Unclosed comment', Action.ERROR),
+    'SLASH': (TokenType.ERROR, 'Invalid input', Action.ERROR),
+    'WHITESPACE': (TokenType.UNKNOWN, '', Action.SKIP),
+    'INVALID': (TokenType.ERROR, 'Invalid input', Action.ERROR),
+}
+# groups whose end depends on the character after them
+LOOKAHEAD_GROUPS = {'ID', 'NUM', 'LOOKAHEAD', 'SLASH'}
+
+
+def tokenize(reader: Reader, result: ScannerResult):
+    """
+    this generator will scan the buffer of the reader with one finditer over the master regex and yield the tokens
+    in the same order get_next_token returns them. the last token is END.
+    """
+    while True:
+        code = reader.code
+        master = MASTER_BYTES if reader.binary else MASTER
+        for match in master.finditer(code, reader.index):
+            if match.end() == len(code):  # the last token of the buffer might go on in the next chunk
+                break
+            token = scan_match(reader, result, match)
+            if token is False:
+                break
+            if token:
+                yield token
+        # the end of the buffer and tokens that need the dfa are scanned one at a time
+        token = get_next_token(reader, result)
+        yield token
+        if token.type == TokenType.END:
+            return
+
+
+def get_next_token_bulk(reader: Reader, result: ScannerResult):
+    """
+    drop-in replacement for dfa.get_next_token that takes the tokens from tokenize, the generator is kept on the
+    reader between the calls
+    """
+    if reader.bulk_tokens is None:
+        reader.bulk_tokens = tokenize(reader, result)
+    for token in reader.bulk_tokens:
+        return token
+    return end_token(reader)  # called again after END
+
+
+def get_next_token(reader: Reader, result: ScannerResult):
+    """
+    drop-in replacement for dfa.get_next_token using the master regex
+    """
+    while True:
+        match = next_match(reader)
+        if not match:
+            return end_token(reader)
+        token = scan_match(reader, result, match)
+        if token is False:
+            return dfa.get_next_token(reader, result)
+        if token:
+            return token
+
+
+def next_match(reader):
+    """
+    will match the master regex at the position of the reader, reading more of the file as long as the match runs
+    into the end of the buffer. returns None at EOF.
+    """
+    while True:
+        match = (MASTER_BYTES if reader.binary else MASTER).match(reader.code, reader.index)
+        if (not match or match.end() == len(reader.code)) and reader.read_chunk(reader.index) is not None:
+            continue
+        return match
+
+
+def end_token(reader):
+    offset = reader.offset + reader.index
+    line, column = reader.locate(offset)
+    token = Token(line, offset, offset, column)
+    token.type = TokenType.END
+    token.content = '$'
+    token.terminal = END_TERMINAL
+    return token
+
+
+def scan_match(reader, result, match):
+    """
+    will add the token of a single match to the result and advance the reader.
+    returns None for comments, whitespace and errors and False if the token has to be scanned by the dfa.
+    """
+    code = reader.code
+    binary = reader.binary
+    group = match.lastgroup
+    end = match.end()
+    if not binary and (group in LOOKAHEAD_GROUPS and end < len(code) and code[end] > '\x7f' or
+                       group == 'INVALID' and code[end - 1] > '\x7f'):
+        return False
+
+    token_type, error, action = GROUPS[group]
+    reader.index = end
+    if action == Action.SKIP:
+        return None
+
+    start = reader.offset + match.start()
+    line, column = reader.locate(start)
+    token = Token(line, start, reader.offset + end, column)
+    token.type = token_type
+    token.error = error
+    token.content = match.group().decode() if binary else match.group()
+
+    if action == Action.ERROR:
+        result.add(result.lexical_errors, token)
+        return None
+
+    if action == Action.ID:
+        terminal = KEYWORD_TERMINALS.get(token.content)
+        if terminal is None:
+            token.symbol_id = result.symbol_table.intern(token.content)
+            terminal = ID_TERMINAL
+        else:
+            token.type = TokenType.KEYWORD
+    elif token_type == TokenType.NUM:
+        terminal = NUM_TERMINAL
+    else:
+        terminal = SYMBOL_TERMINALS.get(token.content, NOT_A_TERMINAL)
+
+    # a token ended by EOF is still reported, but as END like the parser gets it
+    if group in LOOKAHEAD_GROUPS and end == len(code):
+        token.content = '$'
+        token.type = TokenType.END
+        terminal = END_TERMINAL
+    token.terminal = terminal
+    result.tokens.append(token)
+    return token
@@ -0,0 +1,40 @@
+import os
+
+from scanner.const import KEYWORDS, SYMBOLS
+
+GRAMMAR_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'parsers', 'grammar.txt')
+EPSILON = 'EPSILON'
+END = '$'
+NOT_A_TERMINAL = -1  # symbols like ':' the grammar does not use
+
+
+def read_grammar(file_name=GRAMMAR_FILE):
+    """
+    this function will return the rules of grammar.txt as a dict of non terminal -> list of alternatives, and its
+    terminals in the order they first show up with '$' at the end. every symbol that has no rule is a terminal.
+    """
+    rules = {}
+    with open(file_name) as f:
+        for line in f:
+            if '->' not in line:
+                continue
+            non_terminal, alternatives = line.split('->', 1)
+            rules[non_terminal.strip()] = [alternative.split() for alternative in alternatives.split('|')]
+    terminals = []
+    for alternatives in rules.values():
+        for alternative in alternatives:
+            for symbol in alternative:
+                if symbol not in rules and symbol != EPSILON and symbol != END and symbol not in terminals:
+                    terminals.append(symbol)
+    return rules, terminals + [END]
+
+
+# every terminal of the grammar is numbered once, tokens carry the number so the parsers compare ints
+TERMINALS = read_grammar()[1]
+TERMINAL_IDS = {terminal: terminal_id for terminal_id, terminal in enumerate(TERMINALS)}
+END_TERMINAL = TERMINAL_IDS[END]
+ID_TERMINAL = TERMINAL_IDS['ID']
+NUM_TERMINAL = TERMINAL_IDS['NUM']
+# keywords and symbols are terminals by their lexeme, the scanners look them up here once they know the token
+KEYWORD_TERMINALS = {keyword: TERMINAL_IDS.get(keyword, NOT_A_TERMINAL) for keyword in KEYWORDS}
+SYMBOL_TERMINALS = {symbol: TERMINAL_IDS.get(symbol, NOT_A_TERMINAL) for symbol in SYMBOLS}
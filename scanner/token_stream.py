@@ -0,0 +1,91 @@
+from scanner.const import *
+from scanner.dfa import get_next_token
+from scanner.io import *
+
+
+class TokenStream:
+    """
+    the tokens of a reader with any amount of lookahead. scanned tokens are kept in a ring buffer that is filled
+    from the scanner in batches, the tokens before the current one are dropped unless a mark still needs them.
+    """
+    BATCH_SIZE = 64
+
+    def __init__(self, reader, result, scanner=get_next_token, batch_size=BATCH_SIZE):
+        self.reader = reader
+        self.result = result
+        self.scanner = scanner
+        self.batch_size = batch_size
+        size = 1
+        while size < 2 * batch_size:
+            size *= 2
+        self.ring = [None] * size
+        self.mask = size - 1
+        self.head = 0  # position of the current token, positions count every token since the start
+        self.tail = 0  # position after the last scanned token
+        self.marks = []
+        self.end_token = None  # the scanner only returns END after it
+
+    def fill(self, count):
+        """
+        this function will scan at least count tokens more, and a whole batch if it is smaller
+        """
+        tail = self.tail + max(count, self.batch_size)
+        keep_from = min(self.marks, default=self.head)
+        if tail - keep_from > len(self.ring):
+            self.grow(tail - keep_from, keep_from)
+        ring, mask = self.ring, self.mask
+        scanner, reader, result = self.scanner, self.reader, self.result
+        for position in range(self.tail, tail):
+            token = self.end_token
+            if token is None:
+                token = scanner(reader, result)
+                if token.type == TokenType.END:
+                    self.end_token = token
+            ring[position & mask] = token
+        self.tail = tail
+
+    def grow(self, needed, keep_from):
+        size = len(self.ring)
+        while size < needed:
+            size *= 2
+        ring = [None] * size
+        for position in range(keep_from, self.tail):
+            ring[position & (size - 1)] = self.ring[position & self.mask]
+        self.ring = ring
+        self.mask = size - 1
+
+    def peek(self, k=1):
+        """
+        this function will return the k-th token ahead without consuming it, peek(1) is the next token advance returns
+        """
+        position = self.head + k - 1
+        if position >= self.tail:
+            self.fill(position - self.tail + 1)
+        return self.ring[position & self.mask]
+
+    def advance(self):
+        """
+        this function will consume and return the next token
+        """
+        token = self.peek(1)
+        self.head += 1
+        return token
+
+    def mark(self):
+        """
+        this function will remember the current position, reset goes back to it
+        """
+        self.marks.append(self.head)
+        return self.head
+
+    def reset(self):
+        """
+        will go back to the position of the last mark and forget it
+        """
+        self.head = self.marks.pop()
+
+    def release(self):
+        """
+        will forget the last mark without going back
+        """
+        self.marks.pop()
@@ -0,0 +1,223 @@
+from array import array
+
+from scanner.const import *
+from scanner.terminals import NOT_A_TERMINAL
+
+UNKNOWN = TokenType.UNKNOWN  # looking a member up on an Enum class is slow, and every token starts with it
+
+
+class Token:
+    __slots__ = ['type', 'content', 'error', 'line', 'column', 'start', 'end', 'symbol_id', 'terminal', 'index']
+
+    def __init__(self, line, start=0, end=0, column=1):
+        self.type = UNKNOWN
+        self.content = ''
+        self.error = ''
+        self.line = line
+        self.column = column
+        self.start = start  # offsets of the lexeme in the source file
+        self.end = end
+        self.symbol_id = None  # id of an ID in the symbol table of the scanner
+        self.terminal = NOT_A_TERMINAL  # grammar terminal id, set by the scanner
+        self.index = -1  # position in the TokenBuffer of the scanner result, set when the token is appended to it
+
+    def __repr__(self):
+        """
+        this function will the lexeme notation of  a token
+        """
+        if self.type == TokenType.END:
+            return '$'
+        elif self.type != TokenType.ERROR:
+            return f'({self.type.name}, {self.content})'
+        else:
+            if self.error == 'Unclosed comment' and len(self.error) > 7:
+                return f'({self.content.strip()[0:7]}..., {self.error})'
+            return f'({self.content.strip()}, {self.error})'
+
+    def get_terminal_form(self):
+        """
+        this function will return the grammar notation of a token content
+        """
+        if self.type == TokenType.ID or self.type == TokenType.NUM:
+            return self.type.name
+        else:
+            return self.content
+
+
+TOKEN_TYPES = list(TokenType)
+
+
+class InternTable:
+    """
+    insertion ordered table of lexemes where every lexeme gets a stable int id, lookups are a single dict access
+    """
+
+    def __init__(self, lexemes=()):
+        self.ids = {}
+        self.lexemes = []
+        for lexeme in lexemes:
+            self.intern(lexeme)
+
+    def intern(self, lexeme):
+        """
+        this function will return the id of the lexeme, adding it to the end of the table if it is new
+        """
+        lexeme_id = self.ids.get(lexeme)
+        if lexeme_id is None:
+            lexeme_id = self.ids[lexeme] = len(self.lexemes)
+            self.lexemes.append(lexeme)
+        return lexeme_id
+
+    def append(self, lexeme):
+        self.intern(lexeme)
+
+    def __contains__(self, lexeme):
+        return lexeme in self.ids
+
+    def __getitem__(self, lexeme_id):
+        return self.lexemes[lexeme_id]
+
+    def __iter__(self):
+        return iter(self.lexemes)
+
+    def __len__(self):
+        return len(self.lexemes)
+
+
+class TokenBuffer:
+    """
+    the tokens of a whole program stored column wise in int arrays instead of one Token object per token.
+    lexemes are interned, so every distinct lexeme is only stored once.
+    """
+
+    def __init__(self):
+        self.types = array('i')
+        self.terminals = array('i')  # grammar terminal ids, see scanner.terminals
+        self.lexemes = array('i')
+        self.lines = array('i')
+        self.columns = array('i')
+        self.starts = array('i')
+        self.ends = array('i')
+        self.lexeme_table = InternTable()
+        self.compact_size = 0  # size of lexeme_table after the last compact, 0 if it never was
+
+    def append(self, token):
+        token.index = len(self.types)
+        content = token.content
+        lexeme_id = self.lexeme_table.ids.get(content)  # most lexemes were seen before, the lookup is inlined
+        if lexeme_id is None:
+            lexeme_id = self.lexeme_table.intern(content)
+        self.types.append(token.type._value_)  # the enum value without going through the slow value property
+        self.terminals.append(token.terminal)
+        self.lexemes.append(lexeme_id)
+        self.lines.append(token.line)
+        self.columns.append(token.column)
+        self.starts.append(token.start)
+        self.ends.append(token.end)
+
+    def extend(self, other, start=0, stop=None, shift=0, line_shift=0):
+        """
+        this function will append the tokens start:stop of another TokenBuffer, their offsets are moved by shift and
+        their lines by line_shift
+        """
+        if other.lexeme_table is self.lexeme_table:
+            lexemes = other.lexemes[start:stop]
+        else:
+            lexeme_ids = [self.lexeme_table.intern(lexeme) for lexeme in other.lexeme_table]
+            lexemes = (lexeme_ids[lexeme_id] for lexeme_id in other.lexemes[start:stop])
+        self.types.extend(other.types[start:stop])
+        self.terminals.extend(other.terminals[start:stop])
+        self.lexemes.extend(lexemes)
+        self.columns.extend(other.columns[start:stop])
+        if line_shift:
+            self.lines.extend(line + line_shift for line in other.lines[start:stop])
+        else:
+            self.lines.extend(other.lines[start:stop])
+        if shift:
+            self.starts.extend(offset + shift for offset in other.starts[start:stop])
+            self.ends.extend(offset + shift for offset in other.ends[start:stop])
+        else:
+            self.starts.extend(other.starts[start:stop])
+            self.ends.extend(other.ends[start:stop])
+
+    def compact(self):
+        """
+        this function will give the buffer a lexeme table of only the lexemes its tokens use, the others are left
+        in the old table
+        """
+        used = dict.fromkeys(self.lexemes)
+        table = self.lexeme_table
+        self.lexeme_table = InternTable(table[lexeme_id] for lexeme_id in used)
+        self.lexemes = array('i', map(dict(zip(used, range(len(used)))).__getitem__, self.lexemes))
+        self.compact_size = len(used)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.types)
+        if not 0 <= index < len(self.types):
+            raise IndexError('token index out of range')
+        return TokenView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.types)):
+            yield TokenView(self, index)
+
+    def group_by_line(self):
+        """
+        this generator will yield the tokens of every line as a list
+        """
+        lines = self.lines
+        group = []
+        for index in range(len(lines)):
+            if group and lines[index] != lines[index - 1]:
+                yield group
+                group = []
+            group.append(TokenView(self, index))
+        if group:
+            yield group
+
+
+class TokenView:
+    """
+    a single token of a TokenBuffer, it can be used wherever a Token is read
+    """
+    __slots__ = ['buffer', 'index']
+    error = ''  # errors are not stored in a TokenBuffer
+
+    def __init__(self, buffer, index):
+        self.buffer = buffer
+        self.index = index
+
+    @property
+    def type(self):
+        return TOKEN_TYPES[self.buffer.types[self.index]]
+
+    @property
+    def content(self):
+        return self.buffer.lexeme_table[self.buffer.lexemes[self.index]]
+
+    @property
+    def line(self):
+        return self.buffer.lines[self.index]
+
+    @property
+    def column(self):
+        return self.buffer.columns[self.index]
+
+    @property
+    def start(self):
+        return self.buffer.starts[self.index]
+
+    @property
+    def end(self):
+        return self.buffer.ends[self.index]
+
+    @property
+    def terminal(self):
+        return self.buffer.terminals[self.index]
+
+    __repr__ = Token.__repr__
+    get_terminal_form = Token.get_terminal_form
@@ -0,0 +1,79 @@
+from array import array
+
+from scanner import dfa
+from scanner.const import *
+from scanner.io import *
+
+try:
+    import numpy as np
+except ImportError:  # the pre-pass is optional, without numpy the dfa reads every character itself
+    np = None
+
+OTHER, SPACE, LETTER, DIGIT = range(4)
+WINDOW_SIZE = 1 << 14  # characters classified at once, the numpy temporaries are a few times this in bytes
+
+
+def build_kind_table():
+    table = [OTHER] * 256
+    for i in range(128):
+        c = chr(i)
+        if c in WHITESPACE:
+            table[i] = SPACE
+        elif c.isalpha():
+            table[i] = LETTER
+        elif c.isdigit():
+            table[i] = DIGIT
+    return np.array(table, dtype=np.uint8)
+
+
+KINDS = build_kind_table() if np is not None else None
+
+
+def run_ends(mask, ends, start):
+    """
+    this function will return the end of the run of true values every position of mask is in, mask starts at
+    position start and ends holds start + 1, start + 2, ... for it. everything is int32.
+    """
+    last = mask.copy()  # the last position of every run
+    last[:-1] &= ~mask[1:]
+    candidates = np.where(last, ends, np.int32(start + len(mask)))
+    return np.minimum.accumulate(candidates[::-1])[::-1]
+
+
+def classify(code, start, window_size=WINDOW_SIZE):
+    """
+    this function will classify the window of code that begins at start with numpy. for every position of the window
+    the result has the end of the whitespace, number or identifier run it is in, cut off at the end of the window.
+    the other positions point right after themselves, so the dfa doesn't jump over them.
+    """
+    window = code[start:start + window_size]
+    ends = np.arange(start + 1, start + len(window) + 1, dtype=np.int32)
+    if isinstance(window, str):
+        if not window.isascii():  # str positions don't match the utf-8 bytes, nothing is jumped over
+            return array('i', ends.tobytes())
+        window = window.encode()
+    kinds = KINDS[np.frombuffer(window, dtype=np.uint8)]
+    runs = ends.copy()
+    for kind, mask in ((SPACE, kinds == SPACE), (DIGIT, kinds == DIGIT), (LETTER, kinds >= LETTER)):
+        selected = kinds == kind
+        runs[selected] = run_ends(mask, ends, start)[selected]
+    return array('i', runs.tobytes())
+
+
+def prepass_reader(file_name, reader_class=Reader):
+    """
+    this function will open a reader whose buffer the dfa jumps over with the numpy pre-pass, the vector engine
+    reads from these. without numpy, or for files past what int32 offsets hold, it is a plain reader.
+    """
+    reader = reader_class(file_name)
+    if np is not None and len(reader.code) < 1 << 31:
+        reader.prepass = classify
+    return reader
+
+
+def get_next_token(reader: Reader, result: ScannerResult):
+    """
+    drop-in replacement for dfa.get_next_token for readers of prepass_reader, it jumps over identifier, number and
+    whitespace runs found by the numpy pre-pass
+    """
+    return dfa.get_next_token(reader, result)
@@ -0,0 +1,80 @@
+"""
+checks that scanner.cache only replays a scan made with the same scanner and grammar. the scanner and grammar.txt
+are copied to a temporary directory, a file is scanned twice with a cache there, then the grammar is changed so
+its terminals are numbered differently, and the next scan must miss the cache and give the new terminal ids.
+run it from tests/test_scanner with: python3 check_cache.py ../test_code_gen/T1/input.txt
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+DEFAULT_INPUT = os.path.join(ROOT, 'tests', 'test_code_gen', 'T1', 'input.txt')
+RULE, CHANGED_RULE = 'Type-specifier -> int | void', 'Type-specifier -> void | int'
+
+# scans a file through the cache in the copied tree, prints whether it was a hit and the (token, terminal) pairs
+SCAN = '''
+import json, sys
+from scanner import ScannerResult
+from scanner.cache import CachedReader, TokenCache, get_next_token
+from scanner.const import TokenType
+reader = CachedReader(sys.argv[1], TokenCache(sys.argv[2]))
+hit = reader.cached is not None
+result = ScannerResult()
+tokens = []
+while True:
+    token = get_next_token(reader, result)
+    tokens.append((repr(token), token.terminal))
+    if token.type == TokenType.END:
+        break
+print(json.dumps({'hit': hit, 'tokens': tokens}))
+'''
+
+
+def scan(directory, file_name, cache_directory, use_cache=True):
+    if not use_cache:
+        cache_directory = tempfile.mkdtemp()
+    output = subprocess.run([sys.executable, '-c', SCAN, file_name, cache_directory], cwd=directory,
+                            capture_output=True, text=True, check=True).stdout
+    if not use_cache:
+        shutil.rmtree(cache_directory)
+    return json.loads(output)
+
+
+def check(name, ok):
+    print(f'{name}: {"ok" if ok else "FAILED"}')
+    return ok
+
+
+def main(file_name):
+    file_name = os.path.abspath(file_name)
+    directory = tempfile.mkdtemp()
+    shutil.copytree(os.path.join(ROOT, 'scanner'), os.path.join(directory, 'scanner'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    os.mkdir(os.path.join(directory, 'parsers'))
+    grammar_file = os.path.join(directory, 'parsers', 'grammar.txt')
+    shutil.copy(os.path.join(ROOT, 'parsers', 'grammar.txt'), grammar_file)
+    cache_directory = os.path.join(directory, 'cache')
+    try:
+        first, second = scan(directory, file_name, cache_directory), scan(directory, file_name, cache_directory)
+        ok = check('first scan misses', not first['hit'])
+        same = second['tokens'] == first['tokens']
+        ok = check('second scan hits with the same tokens', second['hit'] and same) and ok
+        with open(grammar_file) as f:
+            grammar = f.read()
+        with open(grammar_file, 'w') as f:
+            f.write(grammar.replace(RULE, CHANGED_RULE))
+        changed = scan(directory, file_name, cache_directory)
+        expected = scan(directory, file_name, cache_directory, use_cache=False)
+        ok = check('scan after a grammar change misses', not changed['hit']) and ok
+        ok = check('it has the new terminal ids', changed['tokens'] == expected['tokens'] != first['tokens']) and ok
+    finally:
+        shutil.rmtree(directory)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INPUT)
@@ -0,0 +1,121 @@
+"""
+checks scanner.incremental.relex and scanner.parallel against scanning the whole source with get_next_token.
+for every input file a series of random edits is applied one after another, like keystrokes in an editor, and the
+source is split at random safe points. without files random sources are checked.
+run it from tests/test_scanner with: python3 check_incremental.py PA1_input_output_samples/T01/input.txt
+"""
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from scanner import Reader, ScannerResult, TextReader, get_next_token, parallel  # noqa: E402
+from scanner.const import TokenType  # noqa: E402
+from scanner.incremental import relex  # noqa: E402
+
+PIECES = list("ab1 9\n\n\t=*/;<{}#") + ['==', '/*', '*/', '//', 'if', 'int ', 'abc', 'x1 ', '\n  ', 'é']
+EDITS = 200  # edits per file
+SPLITS = 50  # random splits per file
+RANDOM_SOURCES = 300
+
+
+def scan(code):
+    reader = TextReader(code)
+    result = ScannerResult()
+    while get_next_token(reader, result).type != TokenType.END:
+        pass
+    return result
+
+
+def dump(result):
+    tokens = [(repr(token), token.line, token.column, token.start, token.end, token.terminal)
+              for token in result.tokens]
+    errors = [[(repr(error), error.line, error.column, error.start, error.end) for error in line_errors]
+              for line_errors in result.lexical_errors]
+    return tokens, errors, list(result.symbol_table)
+
+
+def random_text(rnd, length):
+    return ''.join(rnd.choice(PIECES) for _ in range(length))
+
+
+def random_edit(rnd, code):
+    """
+    this function will return an edit of code, mostly typing or deleting a single character
+    """
+    offset = rnd.randint(0, len(code))
+    if rnd.random() < 0.8:
+        if code and rnd.random() < 0.3:
+            return min(offset, len(code) - 1), 1, ''
+        return offset, 0, rnd.choice('abcxyz019 ;=*/\n')
+    removed = rnd.randint(0, min(6, len(code) - offset))
+    return offset, removed, random_text(rnd, rnd.randint(0, 3))
+
+
+def check_edits(name, code, rnd, count):
+    result = scan(code)
+    for step in range(count):
+        edits = [random_edit(rnd, code)]
+        if rnd.random() < 0.1:  # a few edits at once, each one on the code after the ones before
+            changed = code[:edits[0][0]] + edits[0][2] + code[edits[0][0] + edits[0][1]:]
+            edits.append(random_edit(rnd, changed))
+        code, result = relex(code, result, edits)
+        if dump(result) != dump(scan(code)):
+            print(f'{name}: relex differs from a full scan after edit {step + 1} {edits!r}')
+            return False
+    return True
+
+
+def check_splits(name, code, rnd, count):
+    expected = dump(scan(code))
+    for _ in range(count):
+        bounds = [0] + parallel.find_split_points(code, rnd.randint(2, 8)) + [len(code)]
+        parts = []
+        first_line = 1
+        for start, end in zip(bounds, bounds[1:]):
+            parts.append(parallel.scan_chunk(code[start:end], start, first_line))
+            first_line += code.count('\n', start, end)
+        if dump(parallel.merge_results(parts)) != expected:
+            print(f'{name}: chunks split at {bounds[1:-1]} differ from a full scan')
+            return False
+    return True
+
+
+def check_parallel(name, file_name):
+    code = Reader(file_name).code
+    result = parallel.scan_parallel(file_name, workers=3, min_chunk_size=max(len(code) // 3, 1))
+    if dump(result) != dump(scan(code)):
+        print(f'{name}: scan_parallel differs from a full scan')
+        return False
+    return True
+
+
+def main(file_names):
+    rnd = random.Random(0)
+    failures = 0
+    for file_name in file_names:
+        code = Reader(file_name).code
+        ok = (check_edits(file_name, code, rnd, EDITS) and check_splits(file_name, code, rnd, SPLITS) and
+              check_parallel(file_name, file_name))
+        failures += not ok
+        print(f'{file_name}: {"ok" if ok else "FAILED"}')
+    if not file_names:
+        directory = tempfile.mkdtemp()
+        file_name = os.path.join(directory, 'input.txt')
+        for i in range(RANDOM_SOURCES):
+            code = random_text(rnd, rnd.randint(0, 80))
+            with open(file_name, 'w', newline='') as f:
+                f.write(code)
+            code = Reader(file_name).code
+            name = f'random source {i + 1} {code!r}'
+            failures += not (check_edits(name, code, rnd, 20) and check_splits(name, code, rnd, 10))
+        os.remove(file_name)
+        os.rmdir(directory)
+        print(f'{RANDOM_SOURCES} random sources: {"ok" if not failures else "FAILED"}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,8 @@
+#!/bin/sh
+echo "" > incremental_results.txt
+for dir in PA1_input_output_samples/* PA1_extra_samples/*; do
+    python3 check_incremental.py "${dir}/input.txt" >> incremental_results.txt
+    echo "test $dir finished";
+done
+python3 check_incremental.py >> incremental_results.txt
+echo "random sources finished";